@@ -17,7 +17,7 @@ detector_manager = AnomalyDetectorManager("ewma_baseline_ch01.json")
 @app.post("/api/sensor-data")
 async def process_sensor_data(data: dict):
     result = await detector_manager.process_data(data)
-    return result
+    return result.to_dict()
 ```
 
 작성자: AI Assistant
@@ -25,20 +25,29 @@ async def process_sensor_data(data: dict):
 """
 
 import asyncio
+import atexit
 import json
+import logging
+import queue
+import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
 from datetime import datetime
-from typing import Optional, List, Dict, Any, Callable
+from typing import Optional, List, Dict, Any, Callable, Union, Sequence, Tuple
+import numpy as np
 import pandas as pd
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 
 # 기존 탐지 엔진 임포트
-from home_env_power_detector_v3 import StreamingDetector, EWMABaseline, Config, Event
+from home_env_power_detector_v3 import StreamingDetector, MultiDeviceEWMA, EWMABaseline, Config, Event, warmup_jit
 
 # =============================================================================
 # 데이터 모델 및 결과 클래스
 # =============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class SensorReading:
     """
     센서 데이터 읽기 클래스 (간단한 dict도 받을 수 있음)
@@ -52,26 +61,75 @@ class SensorReading:
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "SensorReading":
-        """딕셔너리에서 SensorReading 객체 생성"""
+        """딕셔너리에서 SensorReading 객체 생성 (대체 키는 기본 키가 없을 때만 조회)"""
         return cls(
-            power_W=float(data.get("power_W", data.get("power", 0))),
-            timestamp=data.get("timestamp"),
-            temp_C=data.get("temp_C", data.get("temperature")),
-            rh_pct=data.get("rh_pct", data.get("humidity")),
-            lux=data.get("lux"),
-            outdoor_temp_C=data.get("outdoor_temp_C", data.get("outside_temp"))
+            float(data["power_W"] if "power_W" in data else data.get("power", 0)),
+            data.get("timestamp"),
+            data["temp_C"] if "temp_C" in data else data.get("temperature"),
+            data["rh_pct"] if "rh_pct" in data else data.get("humidity"),
+            data.get("lux"),
+            data["outdoor_temp_C"] if "outdoor_temp_C" in data else data.get("outside_temp")
         )
 
-@dataclass
+@dataclass(slots=True)
 class DetectionResult:
     """
     탐지 결과 클래스
+    
+    events, sensor_data, stats 딕셔너리는 처음 접근할 때 만들어집니다.
+    (is_anomaly만 확인하는 경우 직렬화 비용이 들지 않음)
+    
+    raw_stats: (평균 W, 표준편차 W, 누적 처리 수, 누적 이상 수, 가동 시간 분) - 반올림 전 값
     """
     timestamp: str
     is_anomaly: bool
-    events: List[Dict[str, Any]]
-    sensor_data: Dict[str, Any]
-    stats: Dict[str, Any]
+    raw_events: List[Event]
+    reading: SensorReading
+    raw_stats: Tuple[float, float, int, int, float]
+    _stats: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False, compare=False)
+    _events: Optional[List[Dict[str, Any]]] = field(default=None, init=False, repr=False, compare=False)
+    _sensor_data: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False, compare=False)
+    
+    @property
+    def events(self) -> List[Dict[str, Any]]:
+        """이벤트 목록 (딕셔너리)"""
+        if self._events is None:
+            self._events = [{
+                "type": event.type,
+                "start": event.start_iso,
+                "end": event.end_iso,
+                "severity": event.severity,
+                "info": event.info
+            } for event in self.raw_events]
+        return self._events
+    
+    @property
+    def sensor_data(self) -> Dict[str, Any]:
+        """입력 센서 데이터 (딕셔너리)"""
+        if self._sensor_data is None:
+            r = self.reading
+            self._sensor_data = {
+                "power_W": r.power_W,
+                "temp_C": r.temp_C,
+                "rh_pct": r.rh_pct,
+                "lux": r.lux,
+                "outdoor_temp_C": r.outdoor_temp_C
+            }
+        return self._sensor_data
+    
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """탐지기 통계 (딕셔너리, 소수점 반올림은 여기서만 수행)"""
+        if self._stats is None:
+            mean, sd, processed, anomalies, uptime = self.raw_stats
+            self._stats = {
+                "current_mean_W": round(mean, 2),
+                "current_std_W": round(sd, 2),
+                "total_processed": processed,
+                "total_anomalies": anomalies,
+                "uptime_minutes": round(uptime, 1)
+            }
+        return self._stats
     
     def to_dict(self) -> Dict[str, Any]:
         """딕셔너리로 변환"""
@@ -83,6 +141,52 @@ class DetectionResult:
             "stats": self.stats
         }
 
+
+# 로그 레벨 이름 → 숫자 (logging 모듈과 같은 값)
+_LOG_LEVELS = {"DEBUG": logging.DEBUG, "INFO": logging.INFO, "WARNING": logging.WARNING, "ERROR": logging.ERROR}
+
+_logger: Optional[logging.Logger] = None
+_logger_lock = threading.Lock()
+
+def _get_logger() -> logging.Logger:
+    """
+    패키지 공용 로거 (처음 호출할 때 한 번만 구성)
+    
+    호출 측은 QueueHandler로 대기열에 넣기만 하고, 실제 stdout 출력은
+    QueueListener 스레드가 담당합니다. (요청 스레드가 stdout 잠금을 기다리지 않음)
+    """
+    global _logger
+    with _logger_lock:
+        if _logger is None:
+            log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+            handler = logging.StreamHandler(sys.stdout)
+            handler.setFormatter(logging.Formatter("[%(asctime)s] %(message)s", "%H:%M:%S"))
+            listener = QueueListener(log_queue, handler)
+            listener.start()
+            atexit.register(listener.stop)  # 종료 시 남은 로그 출력
+            logger = logging.getLogger("anomaly_detector")
+            logger.setLevel(logging.DEBUG)  # 레벨 판정은 매니저별 _log_level_num으로 수행
+            logger.propagate = False
+            logger.addHandler(QueueHandler(log_queue))
+            _logger = logger
+        return _logger
+
+def _parse_timestamp(value: Any) -> datetime:
+    """
+    타임스탬프 파싱 (ISO 문자열은 datetime.fromisoformat으로 빠르게 처리)
+    
+    ISO 형식이 아닌 값만 pd.to_datetime으로 파싱하며, 값이 없거나 파싱에 실패하면 현재 시간을 사용합니다.
+    """
+    if value:
+        try:
+            return datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            try:
+                return pd.to_datetime(value)
+            except Exception:
+                pass
+    return datetime.now()
+
 # =============================================================================
 # 메인 이상 탐지 매니저 클래스
 # =============================================================================
@@ -99,8 +203,9 @@ class AnomalyDetectorManager:
         baseline_file: str = "ewma_baseline_ch01.json",
         config: Optional[Config] = None,
         alert_callback: Optional[Callable[[DetectionResult], None]] = None,
-        log_level: str = "INFO"
-    ):
+        log_level: str = "INFO",
+        alert_queue_size: int = 10_000
+    ) -> None:
         """
         탐지 매니저 초기화
         
@@ -109,8 +214,12 @@ class AnomalyDetectorManager:
             config: 탐지 설정 (None이면 기본값 사용)
             alert_callback: 이상 탐지 시 호출할 콜백 함수
             log_level: 로그 레벨 (DEBUG, INFO, WARNING, ERROR)
+            alert_queue_size: start_alert_worker 사용 시 알림 대기열 크기 (가득 차면 새 알림은 버리고 개수만 기록)
         """
         self.log_level = log_level
+        # 알 수 없는 레벨이면 모든 로그를 출력하지 않음
+        self._log_level_num = _LOG_LEVELS.get(log_level, logging.CRITICAL)
+        self._logger = _get_logger()
         self._log("INFO", "🚀 이상 탐지 매니저 초기화 중...")
         
         try:
@@ -121,12 +230,23 @@ class AnomalyDetectorManager:
             # 설정 및 탐지기 초기화
             self.config = config or Config()
             self.detector = StreamingDetector(self.baseline, self.config)
+            warmup_jit()  # 첫 요청에서 JIT 컴파일 비용이 발생하지 않도록 미리 컴파일
+            self._multi: Optional[MultiDeviceEWMA] = None  # process_multi 첫 호출 시 생성
+            self._stats_cache: Optional[Tuple[int, Tuple[float, float]]] = None  # (탐지기 샘플 수, (평균, 표준편차))
+            self._lock = threading.Lock()  # 탐지기 상태 보호 (탐지기를 갱신하는 모든 경로에서 사용)
+            self._executor: Optional[ThreadPoolExecutor] = None  # process_data_in_executor 첫 호출 시 생성
             
             # 콜백 및 통계
             self.alert_callback = alert_callback
+            self.alert_queue_size = alert_queue_size
+            self.dropped_alerts = 0
+            self._alert_q: Optional[asyncio.Queue] = None  # start_alert_worker 호출 시 생성
+            self._alert_loop: Optional[asyncio.AbstractEventLoop] = None
+            self._alert_task: Optional[asyncio.Task] = None
             self.total_processed = 0
             self.total_anomalies = 0
             self.start_time = datetime.now()
+            self._start_mono_ns = time.monotonic_ns()  # 가동 시간 계산용 (시계 조정 영향 없음)
             
             self._log("INFO", f"🔍 탐지기 준비 완료 (EWMA_k={self.config.ewma_k}, 전류한계={self.config.current_limit_A}A)")
             
@@ -134,11 +254,41 @@ class AnomalyDetectorManager:
             self._log("ERROR", f"❌ 초기화 실패: {e}")
             raise
     
-    def _log(self, level: str, message: str):
-        """간단한 로깅"""
-        if self.log_level == "DEBUG" or (self.log_level == "INFO" and level in ["INFO", "WARNING", "ERROR"]) or (self.log_level == "WARNING" and level in ["WARNING", "ERROR"]) or (self.log_level == "ERROR" and level == "ERROR"):
-            timestamp = datetime.now().strftime("%H:%M:%S")
-            print(f"[{timestamp}] {message}")
+    @property
+    def alert_callback(self) -> Optional[Callable[[DetectionResult], None]]:
+        """이상 탐지 시 호출할 콜백 함수"""
+        return self._alert_callback
+    
+    @alert_callback.setter
+    def alert_callback(self, callback: Optional[Callable[[DetectionResult], None]]) -> None:
+        # 코루틴 함수 여부는 등록 시 한 번만 판정
+        self._alert_callback = callback
+        self._callback_is_coro = callback is not None and asyncio.iscoroutinefunction(callback)
+    
+    def _detector_stats(self) -> Tuple[float, float]:
+        """
+        탐지기 (평균, 표준편차)
+        
+        탐지기 누적 샘플 수가 그대로면 직전에 계산한 값을 재사용합니다.
+        (처리 직후 get_status를 호출해도 다시 계산하지 않음)
+        """
+        n = self.detector.sample_count
+        cached = self._stats_cache
+        if cached is not None and cached[0] == n:
+            return cached[1]
+        stats = self.detector._stats()
+        self._stats_cache = (n, stats)
+        return stats
+    
+    def _uptime_minutes(self) -> float:
+        """가동 시간 (분)"""
+        return (time.monotonic_ns() - self._start_mono_ns) / 6e10
+    
+    def _log(self, level: str, message: str) -> None:
+        """간단한 로깅 (대기열에 넣고 바로 반환)"""
+        level_num = _LOG_LEVELS[level]
+        if level_num >= self._log_level_num:
+            self._logger.log(level_num, message)
     
     async def process_data(self, data: Dict[str, Any]) -> DetectionResult:
         """
@@ -152,18 +302,138 @@ class AnomalyDetectorManager:
         Returns:
             DetectionResult: 탐지 결과
         """
+        result = self._process_data_locked(data)
+        if result.is_anomaly and self.alert_callback:
+            await self._dispatch_alert(result)
+        return result
+    
+    def process_data_sync(self, data: Dict[str, Any]) -> DetectionResult:
+        """
+        동기 버전의 데이터 처리 (비동기 환경이 아닐 때 사용)
+        
+        이벤트 루프를 만들지 않고 탐지를 직접 수행합니다.
+        비동기 콜백은 이상이 탐지된 경우에만 asyncio.run으로 실행합니다.
+        """
+        result = self._process_data_locked(data)
+        if result.is_anomaly and self.alert_callback:
+            self._notify_sync(result)
+        return result
+    
+    def process_data_fast(self, data: Dict[str, Any]) -> DetectionResult:
+        """
+        스레드풀용 동기 데이터 처리 (FastAPI의 def 엔드포인트에서 사용)
+        
+        코루틴을 만들지 않고 전체 파이프라인을 바로 실행합니다.
+        여러 워커 스레드에서 동시에 호출해도 탐지기 상태가 섞이지 않도록 잠금을 사용합니다.
+        """
+        result = self._process_data_locked(data)
+        if result.is_anomaly and self.alert_callback:
+            self._notify_sync(result)
+        return result
+    
+    async def process_data_in_executor(self, data: Dict[str, Any]) -> DetectionResult:
+        """
+        탐지 작업을 전용 워커 스레드에서 실행 (이벤트 루프를 막지 않음)
+        
+        워커가 하나뿐이므로 요청 순서대로 탐지기 상태가 갱신되고,
+        알림 콜백은 process_data와 같은 방식으로 전달됩니다.
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="anomaly-detector")
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(self._executor, self._process_data_locked, data)
+        if result.is_anomaly and self.alert_callback:
+            await self._dispatch_alert(result)
+        return result
+    
+    def _process_data_locked(self, data: Dict[str, Any]) -> DetectionResult:
+        """_process_data_impl을 잠금 안에서 실행 (모든 처리 경로 공통, 경로를 섞어 호출해도 탐지기 상태가 섞이지 않음)"""
+        with self._lock:
+            return self._process_data_impl(data)
+    
+    def close(self) -> None:
+        """전용 워커 스레드와 알림 드레인 태스크 종료 (서버 종료 시 호출, 남은 알림은 먼저 flush_alerts로 처리)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        if self._alert_task is not None:
+            self._alert_task.cancel()
+            self._alert_task = self._alert_q = self._alert_loop = None
+    
+    def _notify_sync(self, result: DetectionResult) -> None:
+        """이상 탐지 콜백 호출 (이벤트 루프 밖, 비동기 콜백은 asyncio.run으로 실행)"""
+        try:
+            if self._callback_is_coro:
+                asyncio.run(self.alert_callback(result))
+            else:
+                self.alert_callback(result)
+        except Exception as e:
+            self._log("ERROR", f"❌ 콜백 오류: {e}")
+    
+    def start_alert_worker(self) -> None:
+        """
+        현재 이벤트 루프에서 알림 드레인 태스크 시작 (서버 startup 이벤트 등 오래 유지되는 루프에서 호출)
+        
+        이후 비동기 경로의 알림은 대기열에 쌓이고 태스크 하나가 순서대로 콜백을 실행하므로
+        탐지 처리가 콜백의 I/O(웹훅 등) 지연에 묶이지 않습니다. 종료 전에 flush_alerts()를 await하세요.
+        워커를 시작하지 않은 루프(asyncio.run 한 번 호출 등)에서는 콜백을 바로 await합니다.
+        """
+        loop = asyncio.get_running_loop()
+        if self._alert_loop is loop:
+            return
+        self._alert_loop = loop
+        self._alert_q = asyncio.Queue(maxsize=self.alert_queue_size)
+        self._alert_task = loop.create_task(self._alert_drain(self._alert_q))
+    
+    async def _dispatch_alert(self, result: DetectionResult) -> None:
+        """
+        알림 전달 (현재 루프에 드레인 태스크가 있으면 대기열에 추가, 없으면 콜백을 바로 실행)
+        """
+        if self._alert_loop is not asyncio.get_running_loop():
+            # 드레인 태스크가 없는 루프 (짧게 사는 루프에서 알림이 사라지지 않도록 직접 호출)
+            await self._notify(result)
+            return
+        try:
+            self._alert_q.put_nowait(result)
+        except asyncio.QueueFull:
+            self.dropped_alerts += 1
+            if self._log_level_num <= logging.WARNING:
+                self._log("WARNING", f"⚠️ 알림 대기열 가득 참 - 알림 버림 (누적 {self.dropped_alerts}개)")
+    
+    async def _alert_drain(self, queue: asyncio.Queue) -> None:
+        """알림 대기열 소비 태스크"""
+        while True:
+            result = await queue.get()
+            try:
+                await self._notify(result)
+            finally:
+                queue.task_done()
+    
+    async def flush_alerts(self) -> None:
+        """대기 중인 알림 콜백이 모두 끝날 때까지 대기 (종료 직전 등에 사용)"""
+        if self._alert_q is not None and self._alert_loop is asyncio.get_running_loop():
+            await self._alert_q.join()
+    
+    async def _notify(self, result: DetectionResult) -> None:
+        """이상 탐지 콜백 호출 (동기/비동기 콜백 모두 지원)"""
+        try:
+            if self._callback_is_coro:
+                await self.alert_callback(result)
+            else:
+                self.alert_callback(result)
+        except Exception as e:
+            self._log("ERROR", f"❌ 콜백 오류: {e}")
+    
+    def _process_data_impl(self, data: Dict[str, Any]) -> DetectionResult:
+        """
+        센서 데이터 파싱 → 이상 탐지 → 결과 생성 (콜백 제외, 동기/비동기 공통 경로)
+        """
         try:
             # 데이터 파싱
             sensor_reading = SensorReading.from_dict(data)
             
             # 타임스탬프 처리
-            if sensor_reading.timestamp:
-                try:
-                    ts = pd.to_datetime(sensor_reading.timestamp)
-                except:
-                    ts = pd.Timestamp.now()
-            else:
-                ts = pd.Timestamp.now()
+            ts = _parse_timestamp(sensor_reading.timestamp)
             
             # 이상 탐지 수행 (기존 StreamingDetector 사용)
             events = self.detector.update(
@@ -181,77 +451,142 @@ class AnomalyDetectorManager:
                 self.total_anomalies += len(events)
             
             # 현재 탐지기 통계
-            current_stats = self.detector._stats()
+            current_stats = self._detector_stats()
             
             # 결과 생성
             result = DetectionResult(
                 timestamp=ts.isoformat(),
                 is_anomaly=len(events) > 0,
-                events=[{
-                    "type": event.type,
-                    "start": event.start.isoformat(),
-                    "end": event.end.isoformat(),
-                    "severity": event.severity,
-                    "info": event.info
-                } for event in events],
-                sensor_data={
-                    "power_W": sensor_reading.power_W,
-                    "temp_C": sensor_reading.temp_C,
-                    "rh_pct": sensor_reading.rh_pct,
-                    "lux": sensor_reading.lux,
-                    "outdoor_temp_C": sensor_reading.outdoor_temp_C
-                },
-                stats={
-                    "current_mean_W": round(current_stats[0], 2),
-                    "current_std_W": round(current_stats[1], 2),
-                    "total_processed": self.total_processed,
-                    "total_anomalies": self.total_anomalies,
-                    "uptime_minutes": round((datetime.now() - self.start_time).total_seconds() / 60, 1)
-                }
+                raw_events=events,
+                reading=sensor_reading,
+                raw_stats=(current_stats[0], current_stats[1], self.total_processed,
+                           self.total_anomalies, self._uptime_minutes())
             )
             
-            # 로깅
+            # 로깅 (레벨이 꺼져 있으면 메시지 문자열도 만들지 않음)
             if events:
-                self._log("WARNING", f"🚨 이상 탐지! {len(events)}개 이벤트 (전력: {sensor_reading.power_W}W)")
-                for event in events:
-                    self._log("WARNING", f"   • {event.type} ({event.severity})")
+                if self._log_level_num <= logging.WARNING:
+                    self._log("WARNING", f"🚨 이상 탐지! {len(events)}개 이벤트 (전력: {sensor_reading.power_W}W)")
+                    for event in events:
+                        self._log("WARNING", f"   • {event.type} ({event.severity})")
+            elif self._log_level_num <= logging.DEBUG and self.total_processed % 10 == 0:  # 10개마다 로그
+                self._log("DEBUG", f"✅ 정상 - 전력: {sensor_reading.power_W}W (처리: {self.total_processed}개)")
+            
+            return result
+            
+        except Exception as e:
+            self._log("ERROR", f"❌ 데이터 처리 오류: {e}")
+            raise
+    
+    async def process_batch(self, data: Union[pd.DataFrame, Dict[str, Any]]) -> DetectionResult:
+        """
+        여러 센서 데이터를 한 번에 처리하는 배치 버전 (리플레이/대량 수집용)
+        
+        샘플마다 process_data를 호출하는 것과 같은 이벤트를 반환하지만,
+        탐지 연산이 배열 단위로 수행되어 훨씬 빠릅니다.
+        
+        Args:
+            data: 컬럼별 배열을 담은 DataFrame 또는 딕셔너리
+                 필수: power_W (또는 power)
+                 선택: timestamp, temp_C, rh_pct, lux, outdoor_temp_C (process_data와 같은 키)
+        
+        Returns:
+            DetectionResult: 배치 전체의 탐지 결과 (timestamp, sensor_data는 마지막 샘플 기준)
+        
+        Raises:
+            ValueError: 전력 배열이 없거나 비어 있는 경우
+        """
+        def column(*keys: str) -> Optional[np.ndarray]:
+            for key in keys:
+                if key in data and data[key] is not None:
+                    return np.asarray(data[key], dtype=np.float64)
+            return None
+        
+        try:
+            power = column("power_W", "power")
+            if power is None:
+                raise ValueError("power_W (또는 power) 배열이 필요합니다")
+            if len(power) == 0:
+                raise ValueError("빈 배치입니다 (샘플이 1개 이상 필요합니다)")
+            temp = column("temp_C", "temperature")
+            rh = column("rh_pct", "humidity")
+            lux = column("lux")
+            outdoor = column("outdoor_temp_C", "outside_temp")
+            
+            # 타임스탬프가 없으면 현재 시각부터 샘플링 주기 간격으로 생성
+            if "timestamp" in data and data["timestamp"] is not None:
+                ts = pd.DatetimeIndex(pd.to_datetime(data["timestamp"]))
             else:
-                if self.total_processed % 10 == 0:  # 10개마다 로그
-                    self._log("DEBUG", f"✅ 정상 - 전력: {sensor_reading.power_W}W (처리: {self.total_processed}개)")
+                ts = pd.Timestamp.now() + pd.to_timedelta(np.arange(len(power)) * self.detector.dt, unit="s")
+            
+            with self._lock:
+                events = self.detector.update_batch(ts, power, room_temp_C=temp, room_rh_pct=rh,
+                                                    lux=lux, outdoor_temp_C=outdoor)
+                
+                self.total_processed += len(power)
+                self.total_anomalies += len(events)
+                current_stats = self._detector_stats()
+            
+            def last(arr: Optional[np.ndarray]) -> Optional[float]:
+                return None if arr is None or np.isnan(arr[-1]) else float(arr[-1])
+            
+            result = DetectionResult(
+                timestamp=ts[-1].isoformat(),
+                is_anomaly=len(events) > 0,
+                raw_events=events,
+                reading=SensorReading(last(power), None, last(temp), last(rh), last(lux), last(outdoor)),
+                raw_stats=(current_stats[0], current_stats[1], self.total_processed,
+                           self.total_anomalies, self._uptime_minutes())
+            )
+            
+            if events and self._log_level_num <= logging.WARNING:
+                self._log("WARNING", f"🚨 배치 이상 탐지! {len(power)}개 중 {len(events)}개 이벤트")
             
-            # 콜백 호출
             if events and self.alert_callback:
-                try:
-                    if asyncio.iscoroutinefunction(self.alert_callback):
-                        await self.alert_callback(result)
-                    else:
-                        self.alert_callback(result)
-                except Exception as e:
-                    self._log("ERROR", f"❌ 콜백 오류: {e}")
+                await self._dispatch_alert(result)
             
             return result
             
         except Exception as e:
-            self._log("ERROR", f"❌ 데이터 처리 오류: {e}")
+            self._log("ERROR", f"❌ 배치 처리 오류: {e}")
             raise
     
-    def process_data_sync(self, data: Dict[str, Any]) -> DetectionResult:
+    def process_multi(self, device_ids: Sequence[Any], powers: Sequence[float]) -> Dict[str, Any]:
         """
-        동기 버전의 데이터 처리 (비동기 환경이 아닐 때 사용)
+        여러 디바이스의 전력 값을 한 번에 처리 (디바이스별 EWMA Z-스코어 판정)
+        
+        디바이스마다 별도 상태를 유지하며, 갱신은 병렬 ufunc로 일괄 수행됩니다.
+        
+        Args:
+            device_ids: 디바이스 ID 목록 (한 번의 호출 안에서 중복 불가)
+            powers: 디바이스별 전력 값 (W)
+        
+        Returns:
+            {"device_ids": [...], "z": Z-스코어 배열, "is_anomaly": 이상 여부 배열}
+        
+        Raises:
+            ValueError: device_ids가 중복되거나 powers와 길이가 다른 경우 (디바이스 상태는 변경되지 않음)
         """
-        return asyncio.run(self.process_data(data))
+        with self._lock:
+            if self._multi is None:
+                self._multi = MultiDeviceEWMA(self.baseline, self.config)
+            z, above = self._multi.update(device_ids, powers)
+            self.total_processed += len(z)
+            self.total_anomalies += int(above.sum())
+        return {"device_ids": list(device_ids), "z": z, "is_anomaly": above}
     
     def get_status(self) -> Dict[str, Any]:
         """
         현재 탐지기 상태 반환
         """
-        current_stats = self.detector._stats()
+        current_stats = self._detector_stats()
         return {
             "status": "running",
-            "uptime_minutes": round((datetime.now() - self.start_time).total_seconds() / 60, 1),
+            "uptime_minutes": round(self._uptime_minutes(), 1),
             "total_processed": self.total_processed,
             "total_anomalies": self.total_anomalies,
             "anomaly_rate": round(self.total_anomalies / max(1, self.total_processed) * 100, 2),
+            "dropped_alerts": self.dropped_alerts,
             "detector_stats": {
                 "current_mean_W": round(current_stats[0], 2),
                 "current_std_W": round(current_stats[1], 2)
@@ -263,11 +598,12 @@ class AnomalyDetectorManager:
             }
         }
     
-    def reset_stats(self):
+    def reset_stats(self) -> None:
         """통계 초기화"""
         self.total_processed = 0
         self.total_anomalies = 0
         self.start_time = datetime.now()
+        self._start_mono_ns = time.monotonic_ns()
         self._log("INFO", "📊 통계 초기화됨")
 
 # =============================================================================
@@ -335,6 +671,8 @@ if __name__ == "__main__":
             
             await asyncio.sleep(1)  # 1초 간격
         
+        await manager.flush_alerts()
+        
         # 상태 확인
         print(f"\n📈 최종 상태:")
         status = manager.get_status()
@@ -15,6 +15,8 @@ EWMA 이상 탐지 시스템 종합 테스트 코드
 """
 
 import asyncio
+import contextlib
+import io
 import json
 import time
 import requests
@@ -33,13 +35,14 @@ test_results = {
         "total": 0,
         "passed": 0,
         "failed": 0,
+        "skipped": 0,
         "errors": []
     }
 }
 
 def log_test(test_name: str, status: str, message: str = "", details: Any = None):
-    """테스트 결과 로깅"""
-    icon = "✅" if status == "PASS" else "❌" if status == "FAIL" else "⚠️"
+    """테스트 결과 로깅 (SKIP은 실행 환경 문제로 건너뛴 테스트로, 실패에 포함하지 않음)"""
+    icon = "✅" if status == "PASS" else "❌" if status == "FAIL" else "⏭️" if status == "SKIP" else "⚠️"
     print(f"{icon} [{test_name}] {message}")
     
     test_results["tests"][test_name] = {
@@ -52,6 +55,8 @@ def log_test(test_name: str, status: str, message: str = "", details: Any = None
     test_results["summary"]["total"] += 1
     if status == "PASS":
         test_results["summary"]["passed"] += 1
+    elif status == "SKIP":
+        test_results["summary"]["skipped"] += 1
     else:
         test_results["summary"]["failed"] += 1
         test_results["summary"]["errors"].append(f"{test_name}: {message}")
@@ -215,6 +220,13 @@ async def test_anomaly_detector_package():
         else:
             log_test("data_formats", "WARN", f"데이터 형식 테스트: {format_success}/{len(format_tests)} 성공")
         
+        # 빈 배치 테스트 (IndexError 대신 명확한 ValueError)
+        try:
+            await manager.process_batch(pd.DataFrame({"timestamp": [], "power_W": []}))
+            log_test("package_empty_batch", "FAIL", "빈 배치가 오류 없이 처리됨")
+        except ValueError as e:
+            log_test("package_empty_batch", "PASS", f"빈 배치 거부: {str(e)}")
+        
         # 상태 확인 테스트
         status = manager.get_status()
         if status["status"] == "running" and status["total_processed"] > 0:
@@ -225,6 +237,114 @@ async def test_anomaly_detector_package():
     except Exception as e:
         log_test("package_test", "FAIL", f"패키지 테스트 실패: {str(e)}")
 
+async def test_alert_delivery():
+    """알림 콜백 전달 테스트 (직접 호출, 드레인 워커 + flush_alerts, 대기열 가득 참)"""
+    print("\n" + "="*60)
+    print("🔔 4-1. 알림 콜백 전달 테스트")
+    print("="*60)
+    
+    try:
+        from anomaly_detector_package import AnomalyDetectorManager
+        
+        # 1000W/9000W를 번갈아 넣으면 두 번째 샘플부터 매번 이상 탐지
+        start = datetime(2024, 7, 1)
+        samples = [{"power_W": 1000.0 if i % 2 == 0 else 9000.0,
+                    "timestamp": (start + timedelta(seconds=2 * i)).isoformat()} for i in range(7)]
+        
+        # 워커 없이 asyncio.run (짧게 사는 루프): process_data가 끝나기 전에 콜백 실행
+        received = []
+        
+        async def on_alert(result):
+            await asyncio.sleep(0)  # 웹훅 등 실제 I/O처럼 이벤트 루프에 양보
+            received.append(result.timestamp)
+        
+        manager = AnomalyDetectorManager(alert_callback=on_alert, log_level="ERROR")
+        
+        async def run_once():
+            return [(await manager.process_data(d)).is_anomaly for d in samples]
+        
+        flags = await asyncio.to_thread(asyncio.run, run_once())
+        if sum(flags) > 0 and len(received) == sum(flags):
+            log_test("alert_direct", "PASS", f"워커 없는 루프에서 알림 {len(received)}개 모두 전달")
+        else:
+            log_test("alert_direct", "FAIL", f"알림 누락: 이상 {sum(flags)}개 중 {len(received)}개 전달")
+        
+        # 드레인 워커: 콜백은 대기열에서 실행되고 flush_alerts 후 모두 전달됨
+        received.clear()
+        manager = AnomalyDetectorManager(alert_callback=on_alert, log_level="ERROR")
+        manager.start_alert_worker()
+        flags = await run_once()
+        await manager.flush_alerts()
+        manager.close()
+        if sum(flags) > 0 and len(received) == sum(flags) and manager.dropped_alerts == 0:
+            log_test("alert_worker", "PASS", f"드레인 워커로 알림 {len(received)}개 순서대로 전달")
+        else:
+            log_test("alert_worker", "FAIL", f"알림 누락: 이상 {sum(flags)}개 중 {len(received)}개 전달")
+        
+        # 대기열 가득 참: 콜백이 막혀 있는 동안 대기열(1개)을 넘는 알림은 버리고 개수만 기록
+        release = asyncio.Event()
+        blocked = []
+        
+        async def slow_alert(result):
+            await release.wait()
+            blocked.append(result.timestamp)
+        
+        manager = AnomalyDetectorManager(alert_callback=slow_alert, log_level="ERROR", alert_queue_size=1)
+        manager.start_alert_worker()
+        n_alerts = 0
+        for d in samples[:5]:
+            n_alerts += (await manager.process_data(d)).is_anomaly
+            await asyncio.sleep(0)  # 드레인 태스크가 첫 알림을 꺼내 콜백에서 대기하도록 양보
+        release.set()
+        await manager.flush_alerts()
+        manager.close()
+        # 4개 알림 중 1개는 콜백 실행 중, 1개는 대기열, 나머지 2개는 버려짐
+        if n_alerts == 4 and len(blocked) == 2 and manager.dropped_alerts == 2:
+            log_test("alert_drop", "PASS", f"대기열 가득 참 시 {manager.dropped_alerts}개 버림, {len(blocked)}개 전달")
+        else:
+            log_test("alert_drop", "FAIL",
+                     f"이상 {n_alerts}개, 전달 {len(blocked)}개, 버림 {manager.dropped_alerts}개 (기대: 4/2/2)")
+    except Exception as e:
+        log_test("alert_delivery", "FAIL", f"알림 전달 테스트 실패: {str(e)}")
+
+def test_multi_device():
+    """다중 디바이스 처리 테스트 (디바이스별 상태 분리, 중복 ID 거부)"""
+    print("\n" + "="*60)
+    print("🏠 4-2. 다중 디바이스 처리 테스트")
+    print("="*60)
+    
+    try:
+        from anomaly_detector_package import AnomalyDetectorManager
+        
+        manager = AnomalyDetectorManager(log_level="ERROR")
+        mean, sd = manager.baseline.mean(), manager.baseline.std()
+        devices = ["fridge", "aircon", "washer"]
+        for _ in range(20):
+            manager.process_multi(devices, [mean] * len(devices))
+        
+        # 한 디바이스만 급증 → 그 디바이스만 이상
+        result = manager.process_multi(devices, [mean, mean + 20 * sd, mean])
+        flagged = [d for d, a in zip(result["device_ids"], result["is_anomaly"]) if a]
+        if flagged == ["aircon"]:
+            log_test("multi_device", "PASS", f"디바이스별 판정 성공 (이상: {flagged})")
+        else:
+            log_test("multi_device", "FAIL", f"디바이스별 판정 오류 (이상: {flagged})")
+        
+        # 중복 ID는 거부하고, 거부된 호출의 새 디바이스는 등록하지 않음
+        n_devices = manager._multi.device_count
+        n_processed = manager.total_processed
+        try:
+            manager.process_multi(["fridge", "heater", "heater"], [mean, mean, mean])
+            log_test("multi_device_duplicate", "FAIL", "중복 디바이스 ID가 거부되지 않음")
+        except ValueError:
+            if manager._multi.device_count == n_devices and manager.total_processed == n_processed:
+                log_test("multi_device_duplicate", "PASS", "중복 디바이스 ID 거부 (상태 변경 없음)")
+            else:
+                log_test("multi_device_duplicate", "FAIL",
+                         f"거부된 호출이 상태를 변경함 (디바이스 {n_devices} → {manager._multi.device_count}개)")
+    except Exception as e:
+        log_test("multi_device", "FAIL", f"다중 디바이스 테스트 실패: {str(e)}")
+
 def test_batch_processing():
     """배치 처리 시스템 테스트"""
     print("\n" + "="*60)
@@ -278,6 +398,144 @@ def test_batch_processing():
     except Exception as e:
         log_test("batch_processing", "FAIL", f"배치 처리 테스트 실패: {str(e)}")
 
+def test_batch_usecols():
+    """배치 처리 컬럼 선택(usecols) 회귀 테스트: 필요한 컬럼만 읽어도 전체 컬럼을 읽은 결과와 같아야 함"""
+    print("\n" + "="*60)
+    print("📊 5-1. 배치 컬럼 선택 회귀 테스트")
+    print("="*60)
+    
+    test_csv_file = "test_batch_usecols.csv"
+    try:
+        import numpy as np
+        from home_env_power_detector_v3 import run_batch, StreamingDetector, EWMABaseline
+        
+        # 외부 온도/습도를 입력 CSV에 표준 컬럼명으로 직접 포함 (weather_csv 없음) + 사용하지 않는 컬럼
+        n = 2000
+        rng = np.random.default_rng(0)
+        ts = pd.Timestamp("2024-07-01") + pd.to_timedelta(np.arange(n) * 2, unit="s")
+        power = rng.normal(1000, 50, n)
+        power[500:520] = 8000  # 과전류/EWMA 이상 구간
+        test_df = pd.DataFrame({
+            "timestamp": ts,
+            "power_W": power,
+            "room_temp_C": rng.uniform(24, 34, n),
+            "rh_pct": rng.uniform(40, 60, n),
+            "lux": rng.uniform(50, 200, n),
+            "outside_temp_C": rng.uniform(20, 30, n),
+            "note": "unused",
+        })
+        test_df.to_csv(test_csv_file, index=False)
+        
+        # 기준: 컬럼 선택 없이 전체 CSV를 읽어 탐지기에 직접 전달
+        full = pd.read_csv(test_csv_file)
+        full["timestamp"] = pd.to_datetime(full["timestamp"])
+        full = full.set_index("timestamp")
+        det = StreamingDetector(EWMABaseline.from_json("ewma_baseline_ch01.json"))
+        expected = det.update_batch(
+            full.index, full["power_W"].to_numpy(),
+            room_temp_C=full["room_temp_C"].to_numpy(), room_rh_pct=full["rh_pct"].to_numpy(),
+            lux=full["lux"].to_numpy(), outdoor_temp_C=full["outside_temp_C"].to_numpy())
+        expected_thermal = sum(e.type.startswith("thermal") for e in expected)
+        
+        # 이벤트마다 출력되는 탐지 로그는 숨김 (테스트 결과만 표시)
+        with contextlib.redirect_stdout(io.StringIO()):
+            result_df = run_batch(input_csv=test_csv_file, baseline_json="ewma_baseline_ch01.json")
+        got_thermal = int(result_df["type"].str.startswith("thermal").sum()) if len(result_df) else 0
+        
+        if len(result_df) == len(expected) and got_thermal == expected_thermal and expected_thermal > 0:
+            log_test("batch_usecols", "PASS", f"컬럼 선택 후에도 결과 동일 ({len(expected)}개 이벤트, 온도 {expected_thermal}개)")
+        else:
+            log_test("batch_usecols", "FAIL",
+                     f"이벤트 수 불일치: 전체 컬럼 {len(expected)}개(온도 {expected_thermal}개) vs run_batch {len(result_df)}개(온도 {got_thermal}개)")
+    except Exception as e:
+        log_test("batch_usecols", "FAIL", f"컬럼 선택 회귀 테스트 실패: {str(e)}")
+    finally:
+        if os.path.exists(test_csv_file):
+            os.remove(test_csv_file)
+
+def test_csv_engine_parity():
+    """CSV 엔진 일치 테스트: pyarrow 사용 시에도 오프셋 타임스탬프가 C 엔진과 같은 시각/시간대로 파싱되어야 함"""
+    print("\n" + "="*60)
+    print("🕒 5-2. CSV 엔진 타임스탬프 일치 테스트")
+    print("="*60)
+    
+    import home_env_power_detector_v3 as v3
+    if v3._CSV_ENGINE != "pyarrow":
+        log_test("csv_engine_parity", "SKIP", "pyarrow 미설치로 건너뜀 (C 엔진만 사용)")
+        return
+    
+    test_csv_file = "test_csv_engine_parity.csv"
+    try:
+        # 월 경계 근처 (+09:00 기준 7월 1일 새벽 = UTC 기준 6월 30일)
+        cases = {
+            "offset": ["2024-07-01T05:00:00+09:00", "2024-07-01T05:00:02+09:00"],
+            "naive": ["2024-07-01 05:00:00", "2024-07-01 05:00:02"],
+        }
+        mismatched = []
+        for name, stamps in cases.items():
+            pd.DataFrame({"timestamp": stamps, "power_W": [1000.0, 1010.0]}).to_csv(test_csv_file, index=False)
+            expected = pd.to_datetime(pd.read_csv(test_csv_file, engine="c")["timestamp"])
+            got = pd.to_datetime(v3._read_csv(test_csv_file, v3._TS_COL_NAMES + v3._POWER_COL_NAMES)["timestamp"])
+            # 시간 단위(s/us)는 엔진마다 다를 수 있으나 탐지기는 ns로 변환하므로 시각과 시간대만 비교
+            if not (got.dt.tz == expected.dt.tz and got.dt.as_unit("ns").equals(expected.dt.as_unit("ns"))):
+                mismatched.append(f"{name}: {got.iloc[0]} vs {expected.iloc[0]}")
+        
+        if not mismatched:
+            log_test("csv_engine_parity", "PASS", "오프셋/일반 타임스탬프 모두 C 엔진과 동일하게 파싱")
+        else:
+            log_test("csv_engine_parity", "FAIL", f"엔진별 파싱 결과 불일치: {mismatched}")
+    except Exception as e:
+        log_test("csv_engine_parity", "FAIL", f"CSV 엔진 일치 테스트 실패: {str(e)}")
+    finally:
+        if os.path.exists(test_csv_file):
+            os.remove(test_csv_file)
+
+async def test_websocket_replay_order():
+    """WebSocket 재전송 순서 테스트: 재전송 중 브로드캐스트가 와도 과거 이벤트 → 새 이벤트 순서 유지"""
+    print("\n" + "="*60)
+    print("🔌 5-3. WebSocket 재전송 순서 테스트")
+    print("="*60)
+    
+    try:
+        from realtime_anomaly_server import RealtimeAnomalyServer, DetectionResult
+    except ImportError as e:
+        log_test("websocket_replay_order", "SKIP", f"실시간 서버 모듈 임포트 불가로 건너뜀: {str(e)}")
+        return
+    
+    class FakeWebSocket:
+        """전송마다 이벤트 루프에 양보하는 테스트용 WebSocket"""
+        def __init__(self):
+            self.received = []
+        
+        async def send_text(self, message: str):
+            await asyncio.sleep(0)
+            self.received.append(json.loads(message)["timestamp"])
+    
+    def make_result(i: int) -> DetectionResult:
+        return DetectionResult(timestamp=f"event-{i:02d}", events=[{"type": "test"}], sensor_data={}, stats={})
+    
+    try:
+        rt_server = RealtimeAnomalyServer()
+        n_old, n_new = 20, 10
+        for i in range(n_old):
+            await rt_server.broadcast_to_websockets(make_result(i))
+        
+        async def broadcast_new():
+            for i in range(n_old, n_old + n_new):
+                await rt_server.broadcast_to_websockets(make_result(i))
+        
+        # 새 클라이언트 재전송과 브로드캐스트를 동시에 실행
+        ws = FakeWebSocket()
+        await asyncio.gather(rt_server.add_websocket_client(ws), broadcast_new())
+        
+        expected = [f"event-{i:02d}" for i in range(n_old + n_new)]
+        if ws.received == expected and ws in rt_server.websocket_clients:
+            log_test("websocket_replay_order", "PASS", f"재전송 {n_old}개 + 동시 브로드캐스트 {n_new}개 순서 유지")
+        else:
+            log_test("websocket_replay_order", "FAIL", f"수신 순서 불일치: {ws.received}")
+    except Exception as e:
+        log_test("websocket_replay_order", "FAIL", f"재전송 순서 테스트 실패: {str(e)}")
+
 async def test_performance():
     """성능 테스트"""
     print("\n" + "="*60)
@@ -310,6 +568,24 @@ async def test_performance():
         else:
             log_test("performance", "WARN", f"성능 주의 - {throughput:.0f} 데이터/초 처리")
         
+        # 같은 데이터를 배치 경로로 한 번에 처리
+        batch_manager = AnomalyDetectorManager("ewma_baseline_ch01.json", log_level="ERROR")
+        start_time = time.time()
+        
+        await batch_manager.process_batch({
+            "power_W": [1000 + (i % 100) * 5 for i in range(test_count)],
+            "temp_C": [25 + (i % 10) for i in range(test_count)],
+            "lux": [100] * test_count
+        })
+        
+        elapsed = time.time() - start_time
+        batch_throughput = test_count / max(elapsed, 1e-9)
+        
+        if batch_throughput > throughput:
+            log_test("performance_batch", "PASS", f"배치 성능 테스트 통과 - {batch_throughput:.0f} 데이터/초 처리")
+        else:
+            log_test("performance_batch", "WARN", f"배치 경로가 더 느림 - {batch_throughput:.0f} 데이터/초 처리")
+        
     except Exception as e:
         log_test("performance", "FAIL", f"성능 테스트 실패: {str(e)}")
 
@@ -353,6 +629,8 @@ def generate_test_report():
     print(f"📊 총 테스트: {summary['total']}개")
     print(f"✅ 성공: {summary['passed']}개")
     print(f"❌ 실패: {summary['failed']}개")
+    if summary['skipped']:
+        print(f"⏭️  건너뜀: {summary['skipped']}개")
     
     if summary['failed'] == 0:
         print(f"\n🎉 모든 테스트 통과! 시스템이 정상적으로 작동합니다.")
@@ -385,7 +663,12 @@ async def main():
     test_baseline_loading()
     test_streaming_detector()
     await test_anomaly_detector_package()
+    await test_alert_delivery()
+    test_multi_device()
     test_batch_processing()
+    test_batch_usecols()
+    test_csv_engine_parity()
+    await test_websocket_replay_order()
     await test_performance()
     test_integration_example()
     
@@ -9,14 +9,22 @@
 
 from fastapi import FastAPI, HTTPException, BackgroundTasks
 from fastapi.responses import JSONResponse
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, StrictFloat
 from typing import Dict, Any, Optional
 import asyncio
+import time
 from datetime import datetime
 
 # 우리가 만든 이상 탐지 패키지 임포트
 from anomaly_detector_package import AnomalyDetectorManager, DetectionResult
 
+# orjson이 설치되어 있으면 응답 직렬화에 ORJSONResponse 사용 (numpy 값도 그대로 직렬화)
+try:
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse as DefaultResponse
+except ImportError:
+    DefaultResponse = JSONResponse
+
 # =============================================================================
 # FastAPI 앱 및 데이터 모델
 # =============================================================================
@@ -24,17 +32,21 @@ from anomaly_detector_package import AnomalyDetectorManager, DetectionResult
 app = FastAPI(
     title="기존 서버 + 이상 탐지 통합 예시",
     description="기존 FastAPI 서버에 이상 탐지 기능을 추가한 예시",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=DefaultResponse
 )
 
 # 요청 데이터 모델 (기존 서버의 데이터 형식에 맞춰 조정)
+# 수치 필드는 StrictFloat: JSON 숫자만 받고 문자열 → 숫자 변환을 생략 (pydantic v2)
 class SensorDataRequest(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="ignore")  # 읽기 전용, 알 수 없는 필드는 무시
+
     device_id: str                    # 기존 서버의 디바이스 ID
-    power_W: float                   # 전력 데이터
+    power_W: StrictFloat             # 전력 데이터
     timestamp: Optional[str] = None  # 타임스탬프
-    temp_C: Optional[float] = None   # 온도
-    humidity: Optional[float] = None # 습도 (다른 키명 사용)
-    lux: Optional[float] = None      # 조도
+    temp_C: Optional[StrictFloat] = None   # 온도
+    humidity: Optional[StrictFloat] = None # 습도 (다른 키명 사용)
+    lux: Optional[StrictFloat] = None      # 조도
     
     # 기존 서버의 추가 필드들
     location: Optional[str] = None
@@ -47,6 +59,22 @@ class SensorDataRequest(BaseModel):
 # 전역 탐지 매니저 (서버 시작 시 한 번만 초기화)
 detector_manager = None
 
+# get_status() 결과 캐시 (대시보드 폴링 시 매 요청마다 통계를 다시 계산하지 않도록)
+STATUS_CACHE_TTL_S = 0.5
+_status_cache: Dict[str, Any] = {"t": float("-inf"), "v": None}
+
+def cached_status(ttl: float = STATUS_CACHE_TTL_S) -> Dict[str, Any]:
+    """
+    detector_manager.get_status()를 짧은 TTL로 캐시해 반환
+    상태 값은 누적 카운터라 수백 ms 지연은 문제되지 않음
+    (멀티 워커 배포에서는 워커별 캐시이므로 필요하면 Redis 등 외부 캐시 사용)
+    """
+    now = time.monotonic()
+    if _status_cache["v"] is None or now - _status_cache["t"] > ttl:
+        _status_cache["v"] = detector_manager.get_status()
+        _status_cache["t"] = now
+    return _status_cache["v"]
+
 async def alert_handler(result: DetectionResult):
     """
     이상 탐지 시 호출되는 핸들러
@@ -72,20 +100,33 @@ async def startup_event():
             alert_callback=alert_handler,
             log_level="INFO"
         )
+        detector_manager.start_alert_worker()  # 알림 콜백을 서버 이벤트 루프의 대기열에서 순서대로 실행
         print("✅ 이상 탐지 시스템 초기화 완료")
     except Exception as e:
         print(f"❌ 이상 탐지 시스템 초기화 실패: {e}")
         # 이상 탐지 없이도 서버는 동작하도록 함
         detector_manager = None
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """서버 종료 시 남은 알림 처리 및 워커 스레드 정리"""
+    if detector_manager:
+        await detector_manager.flush_alerts()
+        detector_manager.close()
+
 # =============================================================================
 # API 엔드포인트들
 # =============================================================================
 
 @app.post("/api/sensor-data")
-async def receive_sensor_data(data: SensorDataRequest, background_tasks: BackgroundTasks):
+async def receive_sensor_data(data: SensorDataRequest, background_tasks: BackgroundTasks, sync: bool = False):
     """
     기존 센서 데이터 수신 엔드포인트에 이상 탐지 기능 추가
+    
+    기본적으로 탐지는 응답을 보낸 뒤 백그라운드 작업으로 수행되며 (이상 시 alert_handler로 알림),
+    ?sync=true 요청만 탐지 결과를 기다려 응답에 포함합니다.
+    탐지 작업(CPU)은 매니저의 전용 워커 스레드에서 실행되므로
+    탐지 중에도 이벤트 루프가 다른 요청을 처리할 수 있습니다.
     """
     try:
         # 1. 기존 서버 로직 (예: DB 저장, 검증 등)
@@ -107,11 +148,15 @@ async def receive_sensor_data(data: SensorDataRequest, background_tasks: Backgro
                 "lux": data.lux
             }
             
-            detection_result = await detector_manager.process_data(detection_data)
+            if sync:
+                detection_result = await detector_manager.process_data_in_executor(detection_data)
+            else:
+                # 단일 워커에서 순서대로 처리되므로 샘플 순서가 유지됨
+                background_tasks.add_task(detector_manager.process_data_in_executor, detection_data)
         
         # 3. 응답 구성
         response = {
-            "status": "success",
+            "status": "success" if sync or not detector_manager else "queued",
             "device_id": data.device_id,
             "timestamp": datetime.now().isoformat(),
             "data_received": True,
@@ -141,7 +186,7 @@ async def get_anomaly_status():
         return {"status": "disabled", "message": "이상 탐지 시스템이 비활성화되어 있습니다."}
     
     try:
-        status = detector_manager.get_status()
+        status = cached_status()
         return {
             "status": "active",
             "detector_info": status,
@@ -151,7 +196,7 @@ async def get_anomaly_status():
         return {"status": "error", "message": f"상태 확인 오류: {e}"}
 
 @app.post("/api/test-anomaly")
-async def test_anomaly_detection(test_power: float = 8000):
+def test_anomaly_detection(test_power: float = 8000):
     """
     이상 탐지 테스트 엔드포인트 (개발/테스트용)
     """
@@ -167,13 +212,13 @@ async def test_anomaly_detection(test_power: float = 8000):
             "timestamp": datetime.now().isoformat()
         }
         
-        result = await detector_manager.process_data(test_data)
+        result = detector_manager.process_data_fast(test_data)
         
-        return {
+        return DefaultResponse({
             "test_data": test_data,
             "detection_result": result.to_dict(),
             "message": f"테스트 완료 - {'이상 탐지!' if result.is_anomaly else '정상'}"
-        }
+        })
         
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"테스트 실패: {e}")
@@ -206,7 +251,7 @@ async def get_dashboard_data():
     
     # 이상 탐지 정보 추가
     if detector_manager:
-        anomaly_status = detector_manager.get_status()
+        anomaly_status = cached_status()
         dashboard_data["anomaly_detection"] = {
             "enabled": True,
             "total_processed": anomaly_status["total_processed"],
@@ -230,10 +275,27 @@ if __name__ == "__main__":
     print("📡 API 문서: http://localhost:8001/docs")
     print("🔍 이상 탐지 상태: http://localhost:8001/api/anomaly-status")
     print("🧪 테스트: http://localhost:8001/api/test-anomaly")
+    # 개발용 단일 프로세스 실행. 운영(멀티코어)은 gunicorn + UvicornWorker 사용 (INTEGRATION_GUIDE.md 주의사항 5)
+    
+    # uvloop/httptools가 있으면 명시적으로 사용 (uvicorn[standard] 설치 시 포함, Windows는 uvloop 미지원)
+    # 둘 중 하나만 설치된 경우도 있으므로 각각 확인
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        loop_impl = "uvloop"
+    except ImportError:
+        loop_impl = "auto"
+    try:
+        import httptools  # noqa: F401
+        http_impl = "httptools"
+    except ImportError:
+        http_impl = "auto"
     
     uvicorn.run(
         app,
         host="0.0.0.0",
         port=8001,  # 기존 서버와 다른 포트 사용
+        loop=loop_impl,
+        http=http_impl,
         log_level="info"
     )
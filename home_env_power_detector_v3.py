@@ -1,8 +1,82 @@
 
-from dataclasses import dataclass
-from typing import Optional, List, Dict, Any, Tuple
+from dataclasses import dataclass, field
+from typing import Optional, List, Dict, Any, Tuple, Iterable
 import pandas as pd, numpy as np, json
 import math
+import itertools
+import csv
+import contextlib
+import os
+import importlib.util
+import re
+from functools import lru_cache
+from datetime import datetime, timedelta, timezone
+
+try:
+    from numba import njit, vectorize
+    _NUMBA = True
+except ImportError:  # numba 미설치 환경에서는 순수 파이썬으로 동일하게 동작
+    _NUMBA = False
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda f: f
+    vectorize = njit  # ufunc 커널은 NumPy 산술만 쓰므로 배열에 그대로 적용됨
+
+try:
+    import orjson
+except ImportError:  # orjson 미설치 환경에서는 표준 json 사용
+    orjson = None
+
+# pyarrow가 설치되어 있으면 CSV 파싱에 pyarrow 엔진 사용 (멀티스레드 파서, 결과 dtype은 기본 엔진과 동일한 NumPy)
+_CSV_ENGINE = "pyarrow" if importlib.util.find_spec("pyarrow") is not None else None
+
+# run_batch 결과 컬럼 (반환 DataFrame과 out_csv 헤더)
+_OUT_COLUMNS = ("type", "start", "end", "severity", "info_json")
+
+# run_batch가 인식하는 컬럼명 (소문자 기준)
+_TS_COL_NAMES = ("timestamp", "time", "ts", "datetime")
+_POWER_COL_NAMES = ("power_w", "power", "watts", "w")
+# 탐지에 넘기는 표준 센서 컬럼명 (입력 CSV에 이 이름으로 바로 있어도 사용)
+_SENSOR_COLS = ("room_temp_C", "rh_pct", "lux", "outside_temp_C")
+
+# 타임스탬프 시간 부분 끝의 UTC 오프셋 표기 (Z, +09:00, +0900, +09)
+_TZ_SUFFIX = re.compile(r"(?:Z|[+-]\d{2}(?::?\d{2})?)$")
+
+def _has_utc_offset(value: Any) -> bool:
+    """타임스탬프 문자열에 UTC 오프셋이 붙어 있는지 확인 (날짜 부분의 '-'는 제외)"""
+    parts = re.split(r"[T ]", str(value).strip(), maxsplit=1)
+    return len(parts) == 2 and _TZ_SUFFIX.search(parts[1]) is not None
+
+def _read_csv(path: str, col_names: Optional[Iterable[str]] = None, chunksize: Optional[int] = None):
+    """
+    입력/날씨 CSV를 읽습니다 (pyarrow 엔진 사용 가능 시 사용).
+
+    col_names가 주어지면 헤더만 먼저 읽고, 소문자 이름이 col_names에 있는 컬럼만 파싱합니다.
+    chunksize가 주어지면 청크 단위 반복자를 반환합니다 (pyarrow 엔진은 청크 읽기를 지원하지 않아 C 엔진 사용).
+    pyarrow는 오프셋이 붙은 타임스탬프(+09:00 등)를 UTC로 변환해 읽으므로, 첫 행의 타임스탬프에
+    오프셋이 있으면 C 엔진을 사용합니다 (원래 오프셋 유지, 월/계절 판정과 출력 시간대가 C 엔진과 동일).
+    """
+    usecols = None
+    engine = _CSV_ENGINE
+    if col_names is not None or (engine == "pyarrow" and not chunksize):
+        head = pd.read_csv(path, nrows=1, dtype=str)
+        if col_names is not None:
+            wanted = {str(c).lower() for c in col_names}
+            usecols = [c for c in head.columns if str(c).lower() in wanted]
+        if engine == "pyarrow" and len(head):
+            ts_cols = [c for c in head.columns if str(c).lower() in _TS_COL_NAMES]
+            if any(_has_utc_offset(head.at[0, c]) for c in ts_cols):
+                engine = None
+    if chunksize:
+        return pd.read_csv(path, usecols=usecols, chunksize=chunksize)
+    return pd.read_csv(path, engine=engine, usecols=usecols)
+
+def _info_json(info: Dict[str, Any]) -> str:
+    """이벤트 상세 정보를 JSON 문자열로 직렬화 (orjson 사용 가능 시 numpy 값도 그대로 처리)"""
+    if orjson is not None:
+        return orjson.dumps(info, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+    return json.dumps(info, ensure_ascii=False)
 
 def _ensure_dt_index(s: pd.Series) -> pd.Series:
     """
@@ -22,7 +96,7 @@ def _ensure_dt_index(s: pd.Series) -> pd.Series:
     if s.index.has_duplicates:
         # 중복된 타임스탬프 제거 (첫 번째 값만 유지)
         s = s[~s.index.duplicated(keep="first")]
-    return s.sort_index()
+    return s if s.index.is_monotonic_increasing else s.sort_index()
 
 def _mad_scaled(x: np.ndarray) -> float:
     """
@@ -36,8 +110,24 @@ def _mad_scaled(x: np.ndarray) -> float:
     Returns:
         스케일링된 MAD 값 (표준편차 추정치)
     """
-    med = np.median(x)  # 중앙값 계산
-    mad = np.median(np.abs(x - med))  # 중앙값으로부터의 절대 편차의 중앙값
+    x = np.asarray(x, dtype=np.float64)
+    size = x.size
+    if size == 0:
+        return float("nan")
+    k = size // 2
+    # 전체 정렬 없이 가운데 원소만 선택 (np.partition, O(n))
+    # 마지막 위치도 함께 지정해 NaN이 있으면 끝에 오도록 함 (np.median과 동일하게 NaN 전파)
+    kth = (k - 1, k, size - 1) if size % 2 == 0 else (k, size - 1)
+
+    def middle(part: np.ndarray) -> float:
+        if np.isnan(part[-1]):
+            return float("nan")
+        return float(part[k]) if size % 2 else 0.5 * (part[k - 1] + part[k])
+
+    med = middle(np.partition(x, kth))  # 중앙값 계산
+    dev = np.abs(x - med)
+    dev.partition(kth)  # 임시 배열이므로 복사 없이 제자리 분할
+    mad = middle(dev)  # 중앙값으로부터의 절대 편차의 중앙값
     return 1.4826 * mad  # 정규분포 가정 하에 표준편차와 동등하게 스케일링
 
 def _nearest_join(left: pd.DataFrame, right: pd.DataFrame, on: str, tol_s: float) -> pd.DataFrame:
@@ -57,25 +147,313 @@ def _nearest_join(left: pd.DataFrame, right: pd.DataFrame, on: str, tol_s: float
         left DataFrame에 right의 데이터가 조인된 결과
     """
     tol = pd.to_timedelta(tol_s, unit="s")  # 허용 오차를 timedelta로 변환
-    r = right[[on]].copy()
-    r = r[~r.index.duplicated(keep="first")].sort_index()  # 중복 제거 및 정렬
-    # left의 각 시점에 대해 right에서 가장 가까운 시점의 값을 찾아 매칭
-    matched = r.reindex(left.index, method="nearest", tolerance=tol)
-    out = left.copy()
-    out[on] = matched[on].values  # 매칭된 값을 left에 추가
-    return out
-
-@dataclass
+    r = right[on]  # 단일 컬럼 Series만 사용 (DataFrame 복사 없음)
+    if r.index.has_duplicates:
+        r = r[~r.index.duplicated(keep="first")]  # 중복 제거
+    if not r.index.is_monotonic_increasing:
+        r = r.sort_index()
+    # left의 각 시점에 대해 right에서 가장 가까운 시점의 위치를 찾아 값 배열에서 직접 꺼냄 (-1은 허용 오차 밖)
+    # (merge_asof의 nearest는 동일 거리일 때 이전 값을 택해 결과가 달라지므로 사용하지 않음)
+    if r.empty:
+        return left.assign(**{on: np.nan})
+    idx = r.index.get_indexer(left.index, method="nearest", tolerance=tol)
+    matched = np.where(idx >= 0, r.to_numpy()[idx], np.nan)
+    return left.assign(**{on: matched})  # 매칭된 값을 left에 추가
+
+@njit(cache=True)
+def _ewma_step(ewma: float, sd: float, x: float, k: float, alpha: float) -> Tuple[float, float, bool]:
+    """
+    EWMA 한 스텝을 갱신하고 Z-스코어 임계값 초과 여부를 판정합니다.
+
+    numba가 설치되어 있으면 네이티브 코드로 컴파일됩니다.
+
+    Args:
+        ewma: 직전 EWMA 값 (W)
+        sd: 현재 누적 표준편차 (W)
+        x: 새로운 전력 값 (W)
+        k: Z-스코어 임계값
+        alpha: EWMA 평활 계수
+
+    Returns:
+        (새 EWMA, Z-스코어, 임계값 초과 여부) 튜플
+    """
+    new_ewma = alpha * x + (1.0 - alpha) * ewma
+    z = 0.0 if sd == 0.0 else (x - new_ewma) / sd
+    return new_ewma, z, abs(z) > k
+
+@njit(cache=True)
+def _welford_step(n: int, mean: float, m2: float, x: float) -> Tuple[int, float, float]:
+    """
+    Welford 온라인 알고리즘으로 누적 개수/평균/편차 제곱합(M2)을 갱신합니다.
+
+    sum_sqr/n - mu² 방식처럼 큰 수끼리 빼지 않으므로 n이 커져도 분산 정밀도가 유지됩니다.
+    분산은 M2/n 입니다.
+    """
+    n += 1
+    delta = x - mean
+    mean += delta / n
+    m2 += delta * (x - mean)
+    return n, mean, m2
+
+@njit(cache=True)
+def _ewvar_step(var: float, ewma: float, x: float, alpha: float) -> float:
+    """
+    지수가중 분산을 갱신합니다: S = (1-α)·(S + α·(x - 직전 EWMA)²)
+
+    누적 분산 대신 최근 변동폭을 Z-스코어 분모로 쓸 때 사용합니다 (Config.ewma_local_variance).
+    """
+    d = x - ewma
+    return (1.0 - alpha) * (var + alpha * d * d)
+
+@vectorize(["float64(float64, float64, float64)"], target="parallel", cache=True)
+def _ewma_ufunc(ewma: float, x: float, alpha: float) -> float:
+    """
+    EWMA 갱신식을 원소별로 적용하는 ufunc (여러 디바이스를 병렬로 한 번에 갱신)
+    """
+    return alpha * x + (1.0 - alpha) * ewma
+
+# StreamingDetector 상태/파라미터 배열 인덱스 (JIT 커널과 파이썬 코드가 공유)
+# 실수 상태 (float64)
+_F_EWMA, _F_MEAN, _F_M2, _F_PEAK, _F_LAST_I, _F_EWVAR = range(6)
+# 정수 상태 (int64, 시각은 epoch 기준 ns - float64로는 ns 정밀도가 부족함)
+_I_N, _I_BREACHING, _I_EWMA_START_NS, _I_OVER_ACTIVE, _I_OVER_START_NS, _I_HAS_LAST = range(6)
+# 커널 파라미터 (Config에서 한 번 계산)
+(_P_K, _P_ALPHA, _P_SUSTAIN_SEC, _P_VOLT, _P_WARN_A, _P_LIMIT_A, _P_NEAR_MIN_SEC,
+ _P_SPIKE_DELTA_A, _P_SPIKE_ABS_A, _P_LOCAL_VAR, _P_SUMMER_MONTHS, _P_WINTER_MONTHS, _P_COUNT) = range(13)
+# 커널 출력 버퍼 (이벤트 info 값)
+_O_MU, _O_SD, _O_PEAK, _O_I, _O_DI = range(5)
+# 커널 반환 플래그
+_EV_BREACH_START = 1   # EWMA 이탈 시작 (이탈 시작 시각 = 현재 샘플)
+_EV_EWMA = 2           # power_ewma_anomaly 발생
+_EV_OVER_START = 4     # 과전류 구간 시작 시각 = 현재 샘플
+_EV_OVER = 8           # overcurrent_near_limit 발생
+_EV_OVER_ALERT = 16    # 과전류 이벤트 심각도가 alert
+_EV_SPIKE = 32         # short_spike_suspect 발생
+
+# 계절 비트 (StreamingDetector._season 월별 조회표 값)
+_SEASON_SUMMER = 1
+_SEASON_WINTER = 2
+# 심각도 인덱스 -> 이름 (0은 이벤트 없음)
+_SEVERITY = (None, "warn", "alert")
+
+def _month_mask(months) -> int:
+    """월 번호(1~12) 목록을 비트마스크로 변환 (bit m = m월)"""
+    mask = 0
+    for m in months:
+        if not 1 <= m <= 12:
+            raise ValueError(f"month must be in 1..12, got {m}")
+        mask |= 1 << m
+    return mask
+
+@njit(cache=True)
+def _update_kernel(fs: np.ndarray, st: np.ndarray, params: np.ndarray, out: np.ndarray,
+                   ts_ns: int, x: float) -> int:
+    """
+    StreamingDetector.update의 수치 처리(누적 통계, EWMA 이탈, 과전류, 스파이크)를 한 번에 수행합니다.
+
+    상태 배열을 제자리에서 갱신하고 발생한 일을 비트 플래그로 알려줍니다.
+    Event 객체 생성과 열환경 판정은 호출 측(파이썬)에서 처리합니다.
+
+    Args:
+        fs: 실수 상태 배열 (_F_*)
+        st: 정수 상태 배열 (_I_*)
+        params: 탐지 파라미터 배열 (_P_*)
+        out: 이벤트 info 값 출력 버퍼 (_O_*)
+        ts_ns: 현재 샘플 시각 (epoch 기준 ns)
+        x: 전력 값 (W)
+
+    Returns:
+        _EV_* 플래그 조합 (아무 일도 없으면 0)
+    """
+    flags = 0
+
+    # 누적 통계 (Welford) 및 EWMA
+    n, mu, m2 = _welford_step(st[_I_N], fs[_F_MEAN], fs[_F_M2], x)
+    st[_I_N] = n
+    fs[_F_MEAN] = mu
+    fs[_F_M2] = m2
+    if params[_P_LOCAL_VAR] != 0.0:
+        ewvar = _ewvar_step(fs[_F_EWVAR], fs[_F_EWMA], x, params[_P_ALPHA])
+        fs[_F_EWVAR] = ewvar
+        sd = math.sqrt(ewvar)
+    else:
+        sd = math.sqrt(m2 / n)
+    ewma, z, above = _ewma_step(fs[_F_EWMA], sd, x, params[_P_K], params[_P_ALPHA])
+    fs[_F_EWMA] = ewma
+
+    if above:
+        if st[_I_BREACHING] == 0:
+            st[_I_BREACHING] = 1
+            st[_I_EWMA_START_NS] = ts_ns
+            fs[_F_PEAK] = abs(z)
+            flags |= _EV_BREACH_START
+        else:
+            fs[_F_PEAK] = max(fs[_F_PEAK], abs(z))
+    elif st[_I_BREACHING] != 0:
+        if (ts_ns - st[_I_EWMA_START_NS]) / 1e9 >= params[_P_SUSTAIN_SEC]:
+            out[_O_PEAK] = fs[_F_PEAK]
+            out[_O_MU] = mu
+            out[_O_SD] = sd
+            flags |= _EV_EWMA
+        st[_I_BREACHING] = 0
+        fs[_F_PEAK] = 0.0
+
+    # 전류 (A)
+    I = x / params[_P_VOLT]
+    out[_O_I] = I
+    if I >= params[_P_WARN_A]:
+        if st[_I_OVER_ACTIVE] == 0:
+            st[_I_OVER_ACTIVE] = 1
+            st[_I_OVER_START_NS] = ts_ns
+            flags |= _EV_OVER_START
+        elif (ts_ns - st[_I_OVER_START_NS]) / 1e9 >= params[_P_NEAR_MIN_SEC]:
+            flags |= _EV_OVER | _EV_OVER_START
+            if I >= params[_P_LIMIT_A]:
+                flags |= _EV_OVER_ALERT
+            st[_I_OVER_START_NS] = ts_ns
+    else:
+        st[_I_OVER_ACTIVE] = 0
+
+    if st[_I_HAS_LAST] != 0:
+        dI = I - fs[_F_LAST_I]
+        if abs(dI) >= params[_P_SPIKE_DELTA_A] or I >= params[_P_SPIKE_ABS_A]:
+            out[_O_DI] = dI
+            flags |= _EV_SPIKE
+    fs[_F_LAST_I] = I
+    st[_I_HAS_LAST] = 1
+    return flags
+
+@njit(cache=True, nogil=True)  # 긴 배열 루프 동안 GIL 해제 (다른 스레드의 요청 처리 가능)
+def _ewma_breach_scan(fs: np.ndarray, st: np.ndarray, params: np.ndarray, ts_ns: np.ndarray, x: np.ndarray):
+    """
+    전력 배열 전체에 대해 누적 통계, EWMA Z-스코어, 이탈 구간 판정을 한 번의 루프로 수행합니다.
+
+    _update_kernel의 EWMA 부분을 샘플마다 호출한 것과 같은 순서로 상태를 갱신하며,
+    샘플별 z/mu/sd 배열을 만들지 않고 지속 시간 조건을 만족한 이탈 구간만 기록합니다.
+    상태 배열(fs, st)은 제자리에서 갱신됩니다.
+
+    Args:
+        fs: 실수 상태 배열 (_F_*)
+        st: 정수 상태 배열 (_I_*)
+        params: 탐지 파라미터 배열 (_P_*)
+        ts_ns: 샘플 시각 배열 (epoch 기준 ns, int64)
+        x: 전력 값 배열 (W, float64)
+
+    Returns:
+        (end, start, peak, mu, sd, last_start) - 이벤트별 종료/시작 인덱스(이전 호출에서 시작했으면 -1),
+        최대 |Z|, 종료 시점 평균/표준편차 배열과 마지막 이탈 시작 인덱스(없으면 -1)
+    """
+    size = x.shape[0]
+    # 이탈 종료는 최소 2샘플 간격으로만 발생하므로 이벤트 수는 size // 2 + 1을 넘지 않음
+    cap = size // 2 + 1
+    ev_end = np.empty(cap, dtype=np.int64)
+    ev_start = np.empty(cap, dtype=np.int64)
+    ev_peak = np.empty(cap)
+    ev_mu = np.empty(cap)
+    ev_sd = np.empty(cap)
+    count = 0
+
+    k = params[_P_K]
+    alpha = params[_P_ALPHA]
+    sustain = params[_P_SUSTAIN_SEC]
+    local_var = params[_P_LOCAL_VAR] != 0.0
+    n = st[_I_N]
+    mean = fs[_F_MEAN]
+    m2 = fs[_F_M2]
+    ewma = fs[_F_EWMA]
+    ewvar = fs[_F_EWVAR]
+    peak = fs[_F_PEAK]
+    breaching = st[_I_BREACHING] != 0
+    start_ns = st[_I_EWMA_START_NS]
+    start = -1
+    last_start = -1
+    for i in range(size):
+        v = x[i]
+        n, mean, m2 = _welford_step(n, mean, m2, v)
+        if local_var:
+            ewvar = _ewvar_step(ewvar, ewma, v, alpha)
+            sd = math.sqrt(ewvar)
+        else:
+            sd = math.sqrt(m2 / n)
+        ewma, z, above = _ewma_step(ewma, sd, v, k, alpha)
+
+        if above:
+            if not breaching:
+                breaching = True
+                start_ns = ts_ns[i]
+                start = i
+                last_start = i
+                peak = abs(z)
+            else:
+                peak = max(peak, abs(z))
+        elif breaching:
+            if (ts_ns[i] - start_ns) / 1e9 >= sustain:
+                ev_end[count] = i
+                ev_start[count] = start
+                ev_peak[count] = peak
+                ev_mu[count] = mean
+                ev_sd[count] = sd
+                count += 1
+            breaching = False
+            peak = 0.0
+
+    st[_I_N] = n
+    fs[_F_MEAN] = mean
+    fs[_F_M2] = m2
+    fs[_F_EWMA] = ewma
+    fs[_F_EWVAR] = ewvar
+    fs[_F_PEAK] = peak
+    st[_I_BREACHING] = 1 if breaching else 0
+    st[_I_EWMA_START_NS] = start_ns
+    return ev_end[:count], ev_start[:count], ev_peak[:count], ev_mu[:count], ev_sd[:count], last_start
+
+def warmup_jit() -> None:
+    """
+    JIT 커널을 미리 컴파일하여 첫 데이터 처리 시 컴파일 지연을 없앱니다.
+    """
+    _ewma_step(0.0, 1.0, 0.0, 3.0, 0.2)
+    _update_kernel(np.zeros(6), np.zeros(6, dtype=np.int64), np.ones(_P_COUNT), np.zeros(5), 0, 0.0)
+    _ewma_breach_scan(np.zeros(6), np.zeros(6, dtype=np.int64), np.ones(_P_COUNT), np.zeros(1, dtype=np.int64), np.zeros(1))
+
+@lru_cache(maxsize=32)
+def _load_baseline_fields(path: str, mtime_ns: int) -> Tuple[int, float, float, Optional[float]]:
+    """
+    베이스라인 JSON을 파싱해 (n, sum, sum_sqr, m2)를 반환합니다 (경로+수정시각 기준 캐시).
+    """
+    with open(path, "rb") as f:
+        raw = f.read()
+    d = orjson.loads(raw) if orjson is not None else json.loads(raw)
+    return (int(d["n"]), float(d["sum"]), float(d["sum_sqr"]),
+            float(d["m2"]) if "m2" in d else None)
+
+@dataclass(slots=True)
 class EWMABaseline:
     n: int
     sum: float
     sum_sqr: float
+    m2: Optional[float] = None  # 편차 제곱합 (JSON에 있으면 사용, 없으면 sum/sum_sqr로 계산)
 
     @classmethod
     def from_json(cls, path: str) -> "EWMABaseline":
-        with open(path, "r", encoding="utf-8") as f:
-            d = json.load(f)
-        return cls(n=int(d["n"]), sum=float(d["sum"]), sum_sqr=float(d["sum_sqr"]))
+        # 같은 파일(경로+수정시각)은 한 번만 파싱하고, 인스턴스는 호출마다 새로 만듦
+        n, total, sum_sqr, m2 = _load_baseline_fields(os.path.abspath(path), os.stat(path).st_mtime_ns)
+        return cls(n=n, sum=total, sum_sqr=sum_sqr, m2=m2)
+
+    def to_json(self, path: str) -> None:
+        """
+        베이스라인을 JSON으로 저장합니다 (m2를 함께 저장해 다시 읽을 때 sum_sqr 역산을 피함).
+        """
+        n, _, m2 = self.welford()
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"n": n, "sum": self.sum, "sum_sqr": self.sum_sqr, "m2": m2}, f)
+
+    def welford(self) -> Tuple[int, float, float]:
+        """
+        Welford 누적 상태 (개수, 평균, 편차 제곱합 M2)를 반환합니다.
+        """
+        mean = self.mean()
+        m2 = self.m2 if self.m2 is not None else max(0.0, self.sum_sqr - self.sum * mean)
+        return self.n, mean, m2
 
     def mean(self) -> float:
         """
@@ -91,17 +469,15 @@ class EWMABaseline:
         누적된 통계로부터 표준편차를 계산합니다.
         
         온라인 알고리즘을 사용하여 메모리 효율적으로 계산합니다.
-        공식: σ = √(E[X²] - E[X]²)
+        공식: σ = √(M2 / n)
         
         Returns:
             전력 데이터의 표준편차 (W)
         """
-        mu = self.mean()
-        # 분산 = E[X²] - E[X]² (음수 방지를 위해 max 사용)
-        variance = max(0.0, self.sum_sqr / max(1, self.n) - mu*mu)
-        return math.sqrt(variance)
+        n, _, m2 = self.welford()
+        return math.sqrt(m2 / max(1, n))
 
-@dataclass
+@dataclass(slots=True)
 class Config:
     ewma_alpha: float = 0.2
     ewma_k: float = 3.0
@@ -121,49 +497,121 @@ class Config:
     winter_indoor_above_outdoor_min_alert: float = 3.0
     use_lux_gate: bool = True
     occupancy_lux_threshold: float = 20.0
+    ewma_local_variance: bool = False  # True면 누적 분산 대신 지수가중 분산으로 Z-스코어 계산 (드리프트 대응)
+
+    def to_array(self) -> np.ndarray:
+        """
+        탐지 커널용 파라미터 배열 (_P_* 인덱스 순서의 float64)을 만듭니다.
 
-@dataclass
+        파생 값(경고 전류 등)은 여기서 한 번 계산하고, 계절 월은 월 번호 비트마스크(bit m = m월)로 담습니다.
+        """
+        arr = np.zeros(_P_COUNT, dtype=np.float64)
+        arr[_P_K] = self.ewma_k
+        arr[_P_ALPHA] = self.ewma_alpha
+        arr[_P_SUSTAIN_SEC] = self.ewma_sustain_sec
+        arr[_P_VOLT] = max(1e-9, self.mains_voltage_V)
+        arr[_P_WARN_A] = self.near_limit_ratio * self.current_limit_A
+        arr[_P_LIMIT_A] = self.current_limit_A
+        arr[_P_NEAR_MIN_SEC] = self.near_limit_min_sec
+        arr[_P_SPIKE_DELTA_A] = self.spike_delta_A
+        arr[_P_SPIKE_ABS_A] = self.spike_abs_A
+        arr[_P_LOCAL_VAR] = float(self.ewma_local_variance)
+        arr[_P_SUMMER_MONTHS] = _month_mask(self.summer_months)
+        arr[_P_WINTER_MONTHS] = _month_mask(self.winter_months)
+        return arr
+
+@dataclass(slots=True)  # 인스턴스별 __dict__ 할당 생략
 class Event:
     type: str
     start: pd.Timestamp
     end: pd.Timestamp
     severity: str
     info: Dict[str, Any]
+    _start_iso: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    _end_iso: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def start_iso(self) -> str:
+        """start.isoformat() (처음 접근할 때 한 번만 계산)"""
+        if self._start_iso is None:
+            self._start_iso = self.start.isoformat()
+        return self._start_iso
+
+    @property
+    def end_iso(self) -> str:
+        """end.isoformat() (start와 같은 시각이면 재사용)"""
+        if self._end_iso is None:
+            self._end_iso = self.start_iso if self.end == self.start else self.end.isoformat()
+        return self._end_iso
+
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_UTC = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_ONE_US = timedelta(microseconds=1)
+
+def _to_ns(ts) -> int:
+    """
+    타임스탬프를 epoch 기준 정수 ns로 변환합니다. (pd.Timestamp.value와 같은 기준)
+
+    pd.Timestamp는 .value를 그대로 쓰고, datetime은 pd.Timestamp를 만들지 않고 직접 계산합니다.
+    """
+    if isinstance(ts, pd.Timestamp):
+        return ts.value
+    return (ts - (_EPOCH if ts.tzinfo is None else _EPOCH_UTC)) // _ONE_US * 1000
+
+def _state_array(values, dtype) -> Any:
+    """
+    탐지기 상태/파라미터 배열 생성
+
+    numba가 없으면 커널이 파이썬으로 실행되므로, 원소 접근이 빠른 리스트를 사용합니다.
+    """
+    return np.array(values, dtype=dtype) if _NUMBA else list(values)
 
 class StreamingDetector:
+    # 인스턴스 속성을 고정해 __dict__ 없이 슬롯으로 접근 (서버 경로에서 매 샘플 접근)
+    __slots__ = ("baseline", "cfg", "dt", "_fstate", "_istate", "_params", "_out", "_season",
+                 "_ewma_start", "_over_start", "_last_ts")
+
     def __init__(self, baseline: EWMABaseline, cfg: Optional[Config] = None, sample_period_s: float = 2.0):
         self.baseline = baseline
         self.cfg = cfg or Config()
         self.dt = float(sample_period_s)
-        self._ewma = 0.0
-        self._ewma_breaching = False
+        cfg = self.cfg
+        # 수치 상태는 JIT 커널이 제자리에서 갱신하는 배열로 관리 (_F_*, _I_* 인덱스)
+        n, mean, m2 = baseline.welford()
+        self._fstate = _state_array([0.0, mean, m2, 0.0, 0.0, m2 / max(1, n)], np.float64)
+        self._istate = _state_array([int(n), 0, 0, 0, 0, 0], np.int64)
+        self._params = _state_array(cfg.to_array().tolist(), np.float64)  # Config를 _P_* 배열로 한 번만 변환
+        self._out = _state_array([0.0] * 5, np.float64)
+        # 월(1~12) -> 계절 비트 (_SEASON_SUMMER | _SEASON_WINTER) 조회표, 매 샘플 튜플 탐색 대신 인덱싱
+        summer = int(self._params[_P_SUMMER_MONTHS])
+        winter = int(self._params[_P_WINTER_MONTHS])
+        self._season = [((summer >> m) & 1) * _SEASON_SUMMER | ((winter >> m) & 1) * _SEASON_WINTER
+                        for m in range(13)]
+        # 이벤트 start에 넣을 원래 타임스탬프 객체 (이탈/과전류 구간이 진행 중일 때만 의미 있음)
         self._ewma_start = None
-        self._ewma_peak = 0.0
         self._over_start = None
-        self._over_active = False
-        self._last_I = None
         self._last_ts = None
-        self._n = baseline.n
-        self._sum = baseline.sum
-        self._sum_sqr = baseline.sum_sqr
 
     def _lux_ok(self, lux: Optional[float]) -> bool:
         if not self.cfg.use_lux_gate:
             return True
         return (lux is not None) and (lux >= self.cfg.occupancy_lux_threshold)
 
-    def _update_stats(self, value_w: float):
+    @property
+    def sample_count(self) -> int:
         """
-        새로운 전력 값으로 누적 통계를 업데이트합니다.
-        
-        온라인 알고리즘으로 메모리 효율적인 통계 계산을 수행합니다.
-        
-        Args:
-            value_w: 새로운 전력 값 (W)
+        베이스라인을 포함한 누적 샘플 수 (새 샘플이 들어올 때마다 증가)
+        """
+        return int(self._istate[_I_N])
+
+    def to_baseline(self) -> EWMABaseline:
+        """
+        현재 누적 통계(Welford 상태)를 EWMABaseline으로 내보냅니다 (to_json으로 저장 후 재시작 시 이어서 사용).
         """
-        self._n += 1  # 데이터 포인트 개수 증가
-        self._sum += value_w  # 합계 업데이트
-        self._sum_sqr += value_w * value_w  # 제곱합 업데이트
+        n = int(self._istate[_I_N])
+        mean = float(self._fstate[_F_MEAN])
+        m2 = float(self._fstate[_F_M2])
+        return EWMABaseline(n=n, sum=mean * n, sum_sqr=m2 + n * mean * mean, m2=m2)
 
     def _stats(self) -> Tuple[float,float]:
         """
@@ -172,9 +620,9 @@ class StreamingDetector:
         Returns:
             (평균, 표준편차) 튜플 (단위: W)
         """
-        mu = self._sum / max(1, self._n)  # 평균 계산
-        # 분산 계산 (음수 방지)
-        var = max(0.0, self._sum_sqr / max(1, self._n) - mu*mu)
+        n = int(self._istate[_I_N])
+        mu = float(self._fstate[_F_MEAN])  # 평균 (Welford 누적)
+        var = float(self._fstate[_F_M2]) / max(1, n)  # 분산 = M2 / n
         return mu, math.sqrt(var)  # (평균, 표준편차) 반환
 
     def update(self, ts: pd.Timestamp, power_W: float,
@@ -184,88 +632,252 @@ class StreamingDetector:
                outdoor_temp_C: Optional[float] = None) -> List[Event]:
         out: List[Event] = []
 
-        # EWMA on power_W
-        self._update_stats(power_W)
-        mu, sd = self._stats()
-        alpha = self.cfg.ewma_alpha
-        self._ewma = alpha * power_W + (1 - alpha) * self._ewma
-        z = 0.0 if sd == 0.0 else (power_W - self._ewma) / sd
-        above = abs(z) > self.cfg.ewma_k
-
-        if above and not self._ewma_breaching:
-            self._ewma_breaching = True
-            self._ewma_start = ts
-            self._ewma_peak = abs(z)
-        elif above and self._ewma_breaching:
-            self._ewma_peak = max(self._ewma_peak, abs(z))
-        elif (not above) and self._ewma_breaching:
-            duration = (ts - self._ewma_start).total_seconds()
-            if duration >= self.cfg.ewma_sustain_sec:
+        # 누적 통계/EWMA/과전류/스파이크 판정은 JIT 커널 한 번으로 처리하고,
+        # 파이썬에서는 커널이 알려준 경우에만 Event를 만듦
+        flags = _update_kernel(self._fstate, self._istate, self._params, self._out,
+                               _to_ns(ts), float(power_W))
+        if flags:
+            info = self._out
+            if flags & _EV_BREACH_START:
+                self._ewma_start = ts
+            if flags & _EV_EWMA:
                 out.append(Event(
                     type="power_ewma_anomaly",
                     start=self._ewma_start, end=ts, severity="alert",
-                    info={"z_peak": float(self._ewma_peak), "mu_W": float(mu), "sd_W": float(sd)}
+                    info={"z_peak": float(info[_O_PEAK]), "mu_W": float(info[_O_MU]), "sd_W": float(info[_O_SD])}
                 ))
-            self._ewma_breaching = False
-            self._ewma_start = None
-            self._ewma_peak = 0.0
-
-        # Electrical in Amps (power / V)
-        V = self.cfg.mains_voltage_V
-        I = power_W / max(1e-9, V)
-
-        warn_level = self.cfg.near_limit_ratio * self.cfg.current_limit_A
-        if I >= warn_level:
-            if not self._over_active:
-                self._over_active = True
+            if flags & _EV_OVER:
+                I = float(info[_O_I])
+                out.append(Event(
+                    type="overcurrent_near_limit",
+                    start=self._over_start, end=ts,
+                    severity="alert" if flags & _EV_OVER_ALERT else "warn",
+                    info={"I_A": I, "limit_A": float(self.cfg.current_limit_A),
+                          "ratio": float(I / self.cfg.current_limit_A)}
+                ))
+            if flags & _EV_OVER_START:
                 self._over_start = ts
-            else:
-                duration = (ts - self._over_start).total_seconds()
-                if duration >= self.cfg.near_limit_min_sec:
-                    sev = "alert" if I >= self.cfg.current_limit_A else "warn"
-                    out.append(Event(
-                        type="overcurrent_near_limit",
-                        start=self._over_start, end=ts, severity=sev,
-                        info={"I_A": float(I), "limit_A": float(self.cfg.current_limit_A),
-                              "ratio": float(I / self.cfg.current_limit_A)}
-                    ))
-                    self._over_start = ts
-        else:
-            self._over_active = False
-            self._over_start = None
-
-        if self._last_I is not None and self._last_ts is not None:
-            dI = I - self._last_I
-            if (abs(dI) >= self.cfg.spike_delta_A) or (I >= self.cfg.spike_abs_A):
+            if flags & _EV_SPIKE:
                 out.append(Event(
                     type="short_spike_suspect",
                     start=self._last_ts, end=ts, severity="alert",
-                    info={"delta_A": float(dI), "I_A": float(I)}
+                    info={"delta_A": float(info[_O_DI]), "I_A": float(info[_O_I])}
                 ))
-        self._last_I = I
         self._last_ts = ts
 
         # Thermal vs outdoor
         if (room_temp_C is not None) and (outdoor_temp_C is not None) and self._lux_ok(lux):
-            m = ts.month
-            if m in self.cfg.summer_months:
+            season = self._season[ts.month]
+            if season:
+                cfg = self.cfg
                 diff = room_temp_C - outdoor_temp_C
-                if diff >= self.cfg.summer_indoor_over_outdoor_alert:
-                    out.append(Event("thermal_summer_room_hot_vs_outdoor", ts, ts, "alert",
-                                     {"room_C": float(room_temp_C), "outdoor_C": float(outdoor_temp_C), "delta_C": float(diff)}))
-                elif diff >= self.cfg.summer_indoor_over_outdoor_warn:
-                    out.append(Event("thermal_summer_room_hot_vs_outdoor", ts, ts, "warn",
-                                     {"room_C": float(room_temp_C), "outdoor_C": float(outdoor_temp_C), "delta_C": float(diff)}))
-            if m in self.cfg.winter_months:
-                diff = room_temp_C - outdoor_temp_C
-                if diff <= self.cfg.winter_indoor_above_outdoor_min_alert:
-                    out.append(Event("thermal_winter_room_too_cold_vs_outdoor", ts, ts, "alert",
-                                     {"room_C": float(room_temp_C), "outdoor_C": float(outdoor_temp_C), "delta_C": float(diff)}))
-                elif diff <= self.cfg.winter_indoor_above_outdoor_min_warn:
-                    out.append(Event("thermal_winter_room_too_cold_vs_outdoor", ts, ts, "warn",
-                                     {"room_C": float(room_temp_C), "outdoor_C": float(outdoor_temp_C), "delta_C": float(diff)}))
+                # 심각도 인덱스: alert 조건이면 2, 아니면 warn 조건 여부(1/0) -> _SEVERITY 조회
+                if season & _SEASON_SUMMER:
+                    sev = _SEVERITY[2 * (diff >= cfg.summer_indoor_over_outdoor_alert)
+                                    or (diff >= cfg.summer_indoor_over_outdoor_warn)]
+                    if sev:
+                        out.append(Event("thermal_summer_room_hot_vs_outdoor", ts, ts, sev,
+                                         {"room_C": float(room_temp_C), "outdoor_C": float(outdoor_temp_C), "delta_C": float(diff)}))
+                if season & _SEASON_WINTER:
+                    sev = _SEVERITY[2 * (diff <= cfg.winter_indoor_above_outdoor_min_alert)
+                                    or (diff <= cfg.winter_indoor_above_outdoor_min_warn)]
+                    if sev:
+                        out.append(Event("thermal_winter_room_too_cold_vs_outdoor", ts, ts, sev,
+                                         {"room_C": float(room_temp_C), "outdoor_C": float(outdoor_temp_C), "delta_C": float(diff)}))
         return out
 
+    def update_batch(self, ts: pd.DatetimeIndex, power_W: np.ndarray,
+                     room_temp_C: Optional[np.ndarray] = None,
+                     room_rh_pct: Optional[np.ndarray] = None,
+                     lux: Optional[np.ndarray] = None,
+                     outdoor_temp_C: Optional[np.ndarray] = None) -> List[Event]:
+        """
+        여러 샘플을 한 번에 처리하는 벡터화 버전의 update.
+
+        update()를 샘플마다 순서대로 호출한 것과 같은 이벤트를 같은 순서로 반환하며,
+        탐지기 상태도 동일하게 갱신되므로 update()와 섞어서 호출할 수 있습니다.
+        누적 통계/EWMA 재귀식은 JIT 커널로, 임계값 비교는 NumPy 배열 연산으로 처리하고
+        파이썬 루프는 이벤트 후보 구간에만 적용합니다.
+
+        Args:
+            ts: 샘플 타임스탬프 (시간순 정렬된 DatetimeIndex)
+            power_W: 전력 값 배열 (W)
+            room_temp_C, room_rh_pct, lux, outdoor_temp_C: 선택적 센서 배열 (결측은 NaN)
+
+        Returns:
+            탐지된 Event 목록
+        """
+        ts = pd.DatetimeIndex(ts)
+        p = np.ascontiguousarray(power_W, dtype=np.float64)
+        size = len(p)
+        if size == 0:
+            return []
+        cfg = self.cfg
+        fs, st, params = self._fstate, self._istate, self._params
+        ts_ns = ts.as_unit("ns").asi8
+        found = []  # (샘플 인덱스, 이벤트 순서, Event)
+
+        # EWMA on power_W (누적 통계/EWMA/이탈 판정을 한 번의 JIT 루프로, 이벤트만 반환)
+        ev_end, ev_start, ev_peak, ev_mu, ev_sd, last_start = _ewma_breach_scan(fs, st, params, ts_ns, p)
+        for j in range(len(ev_end)):
+            i = int(ev_end[j])
+            found.append((i, 0, Event(
+                type="power_ewma_anomaly",
+                start=ts[ev_start[j]] if ev_start[j] >= 0 else self._ewma_start, end=ts[i], severity="alert",
+                info={"z_peak": float(ev_peak[j]), "mu_W": float(ev_mu[j]), "sd_W": float(ev_sd[j])}
+            )))
+        if last_start >= 0:
+            self._ewma_start = ts[last_start]
+
+        # Electrical in Amps (power / V)
+        I = p / params[_P_VOLT]
+
+        hot = I >= params[_P_WARN_A]
+        for i in np.flatnonzero(hot):
+            if not (hot[i - 1] if i > 0 else st[_I_OVER_ACTIVE]):
+                st[_I_OVER_ACTIVE] = 1
+                st[_I_OVER_START_NS] = ts_ns[i]
+                self._over_start = ts[i]
+            elif (ts_ns[i] - st[_I_OVER_START_NS]) / 1e9 >= params[_P_NEAR_MIN_SEC]:
+                sev = "alert" if I[i] >= params[_P_LIMIT_A] else "warn"
+                found.append((i, 1, Event(
+                    type="overcurrent_near_limit",
+                    start=self._over_start, end=ts[i], severity=sev,
+                    info={"I_A": float(I[i]), "limit_A": float(cfg.current_limit_A),
+                          "ratio": float(I[i] / cfg.current_limit_A)}
+                )))
+                st[_I_OVER_START_NS] = ts_ns[i]
+                self._over_start = ts[i]
+        if not hot[-1]:
+            st[_I_OVER_ACTIVE] = 0
+
+        # 직전 전류와의 차이 (배열 복사 없이 np.diff, 첫 샘플은 이전 호출의 마지막 전류 기준)
+        dI = np.diff(I, prepend=fs[_F_LAST_I] if st[_I_HAS_LAST] else np.nan)
+        spike = np.abs(dI) >= params[_P_SPIKE_DELTA_A]
+        spike |= I >= params[_P_SPIKE_ABS_A]
+        if not st[_I_HAS_LAST]:
+            spike[0] = False
+        for i in np.flatnonzero(spike):
+            found.append((i, 2, Event(
+                type="short_spike_suspect",
+                start=ts[i - 1] if i > 0 else self._last_ts, end=ts[i], severity="alert",
+                info={"delta_A": float(dI[i]), "I_A": float(I[i])}
+            )))
+        fs[_F_LAST_I] = float(I[-1])
+        st[_I_HAS_LAST] = 1
+        self._last_ts = ts[-1]
+
+        # Thermal vs outdoor
+        if room_temp_C is not None and outdoor_temp_C is not None:
+            room = np.asarray(room_temp_C, dtype=np.float64)
+            outdoor = np.asarray(outdoor_temp_C, dtype=np.float64)
+            ok = ~np.isnan(room) & ~np.isnan(outdoor)
+            if cfg.use_lux_gate:
+                lux_arr = np.full(size, np.nan) if lux is None else np.asarray(lux, dtype=np.float64)
+                ok &= lux_arr >= cfg.occupancy_lux_threshold
+            diff = room - outdoor
+            season = np.asarray(self._season, dtype=np.uint8)[ts.month.to_numpy()]
+            summer = ok & ((season & _SEASON_SUMMER) != 0)
+            winter = ok & ((season & _SEASON_WINTER) != 0)
+            # 심각도 인덱스 배열 (0: 없음, 1: warn, 2: alert) - alert 조건이 우선
+            checks = (
+                (3, summer, "thermal_summer_room_hot_vs_outdoor",
+                 diff >= cfg.summer_indoor_over_outdoor_alert, diff >= cfg.summer_indoor_over_outdoor_warn),
+                (4, winter, "thermal_winter_room_too_cold_vs_outdoor",
+                 diff <= cfg.winter_indoor_above_outdoor_min_alert, diff <= cfg.winter_indoor_above_outdoor_min_warn),
+            )
+            for order, mask, etype, alert_hit, warn_hit in checks:
+                sev_idx = np.where(alert_hit, 2, warn_hit) * mask
+                for i in np.flatnonzero(sev_idx):
+                    found.append((i, order, Event(etype, ts[i], ts[i], _SEVERITY[sev_idx[i]],
+                                                  {"room_C": float(room[i]), "outdoor_C": float(outdoor[i]),
+                                                   "delta_C": float(diff[i])})))
+
+        # 샘플 순서, 샘플 내에서는 update()의 판정 순서대로 정렬
+        found.sort(key=lambda item: (item[0], item[1]))
+        return [e for _, _, e in found]
+
+class MultiDeviceEWMA:
+    """
+    여러 디바이스의 EWMA 상태를 배열로 보관하고 한 번에 갱신하는 탐지기.
+
+    디바이스마다 StreamingDetector를 두는 대신 디바이스 인덱스로 상태 배열을 관리하며,
+    EWMA 갱신은 병렬 ufunc(_ewma_ufunc)로 일괄 계산합니다.
+    EWMA Z-스코어 판정만 수행합니다 (지속 시간/전류/온도 판정은 StreamingDetector 사용).
+    """
+    def __init__(self, baseline: EWMABaseline, cfg: Optional[Config] = None):
+        self.baseline = baseline
+        self.cfg = cfg or Config()
+        self._index: Dict[Any, int] = {}
+        self._ewma = np.zeros(0)
+        self._n = np.zeros(0, dtype=np.int64)
+        self._mean = np.zeros(0)
+        self._m2 = np.zeros(0)
+        self._ewvar = np.zeros(0)
+
+    @property
+    def device_count(self) -> int:
+        """상태를 보관 중인 디바이스 수"""
+        return len(self._index)
+
+    def _rows(self, device_ids) -> np.ndarray:
+        """디바이스 ID를 상태 배열 인덱스로 변환 (처음 보는 디바이스는 베이스라인으로 초기화)"""
+        new = [d for d in dict.fromkeys(device_ids) if d not in self._index]
+        if new:
+            for d in new:
+                self._index[d] = len(self._index)
+            k = len(new)
+            n, mean, m2 = self.baseline.welford()
+            self._ewma = np.concatenate([self._ewma, np.zeros(k)])
+            self._n = np.concatenate([self._n, np.full(k, n, dtype=np.int64)])
+            self._mean = np.concatenate([self._mean, np.full(k, mean)])
+            self._m2 = np.concatenate([self._m2, np.full(k, m2)])
+            self._ewvar = np.concatenate([self._ewvar, np.full(k, m2 / max(1, n))])
+        return np.fromiter((self._index[d] for d in device_ids), dtype=np.int64, count=len(device_ids))
+
+    def update(self, device_ids, power_W) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        디바이스별 전력 값 하나씩을 받아 상태를 갱신합니다.
+
+        Args:
+            device_ids: 디바이스 ID 목록 (한 번의 호출 안에서 중복 불가)
+            power_W: 디바이스별 전력 값 (W)
+
+        Returns:
+            (Z-스코어 배열, 임계값 초과 여부 배열)
+        """
+        # 입력 검증을 먼저 수행 (거부된 호출이 새 디바이스를 등록하지 않도록)
+        device_ids = list(device_ids)
+        if len(dict.fromkeys(device_ids)) != len(device_ids):
+            raise ValueError("device_ids must be unique within one update call")
+        x = np.asarray(power_W, dtype=np.float64)
+        if x.shape != (len(device_ids),):
+            raise ValueError("power_W must have exactly one value per device_id")
+        rows = self._rows(device_ids)
+
+        alpha = self.cfg.ewma_alpha
+        # Welford 누적 통계 (디바이스별 원소 연산)
+        n = self._n[rows] + 1
+        delta = x - self._mean[rows]
+        mean = self._mean[rows] + delta / n
+        m2 = self._m2[rows] + delta * (x - mean)
+        prev_ewma = self._ewma[rows]
+        if self.cfg.ewma_local_variance:
+            d = x - prev_ewma
+            ewvar = (1.0 - alpha) * (self._ewvar[rows] + alpha * d * d)
+            self._ewvar[rows] = ewvar
+            sd = np.sqrt(ewvar)
+        else:
+            sd = np.sqrt(m2 / n)
+        ewma = _ewma_ufunc(prev_ewma, x, alpha)
+        z = np.divide(x - ewma, sd, out=np.zeros_like(x), where=sd != 0.0)
+
+        self._n[rows] = n
+        self._mean[rows] = mean
+        self._m2[rows] = m2
+        self._ewma[rows] = ewma
+        return z, np.abs(z) > self.cfg.ewma_k
+
 # 중복된 클래스 정의 제거됨 - 위에 이미 정의되어 있음
 
 def run_batch(
@@ -277,6 +889,7 @@ def run_batch(
     sample_period_s: float = 2.0,
     out_csv: Optional[str] = None,
     weather_col_candidates: tuple = ("outside_temp_C","outdoor_temp_C","temp_out_C"),
+    chunksize: Optional[int] = None,
 ) -> pd.DataFrame:
     """
     배치 모드로 이상 탐지를 실행하는 메인 함수.
@@ -290,49 +903,70 @@ def run_batch(
     sample_period_s: 데이터 샘플링 주기 (초).
     out_csv: (선택 사항) 탐지된 이벤트를 저장할 출력 CSV 파일 경로.
     weather_col_candidates: weather_csv에서 외부 온도 컬럼을 찾을 때 사용할 후보 컬럼명 튜플.
+    chunksize: (선택 사항) 입력 CSV를 이 행 수만큼씩 읽어 처리합니다. 메모리에는 한 청크만 올라가며
+               탐지기 상태는 청크 사이에 이어집니다. 입력은 시간순으로 정렬되어 있어야 합니다.
+               (None이면 전체를 한 번에 읽고 필요시 정렬)
     """
     cfg = cfg or Config() # 설정 객체 초기화
 
-    # 1. 입력 CSV 파일 로드 및 전처리
+    # 선택적 환경 센서 컬럼 후보 (소문자 컬럼명, 표준 컬럼명, 설명)
+    sensor_mapping = [
+        ("temp_c", "room_temp_C", "실내온도"),
+        ("room_temp_c", "room_temp_C", "실내온도"), 
+        ("rh", "rh_pct", "상대습도"),
+        ("humidity", "rh_pct", "상대습도"),
+        ("lux", "lux", "조도")
+    ]
+
+    # 1. 입력 CSV 파일 로드 및 전처리 (탐지에 쓰는 컬럼만 파싱)
     print(f"📁 입력 파일 로드 중: {input_csv}")
-    df = pd.read_csv(input_csv)
-    print(f"✅ 데이터 로드 완료: {len(df)}개 행, {len(df.columns)}개 컬럼")
+    input_cols = _TS_COL_NAMES + _POWER_COL_NAMES + tuple(m[0] for m in sensor_mapping) + _SENSOR_COLS
+    if chunksize:
+        # 청크 단위 읽기: 첫 청크로 컬럼을 확인하고, 나머지 청크는 탐지하면서 차례로 읽음
+        reader = _read_csv(input_csv, input_cols, chunksize=chunksize)
+        df = next(reader)
+        print(f"✅ 청크 단위 로드: {chunksize:,}개 행씩 처리, {len(df.columns)}개 컬럼")
+    else:
+        df = _read_csv(input_csv, input_cols)
+        print(f"✅ 데이터 로드 완료: {len(df)}개 행, {len(df.columns)}개 컬럼")
     
     # 타임스탬프 컬럼 찾기 및 DatetimeIndex로 설정
     # 다양한 타임스탬프 컬럼명을 지원 (timestamp, time, ts, datetime)
-    ts_col = [c for c in df.columns if str(c).lower() in ("timestamp","time","ts","datetime")]
+    ts_col = [c for c in df.columns if str(c).lower() in _TS_COL_NAMES]
     if not ts_col:
         raise ValueError("input_csv must contain a 'timestamp' column")
     ts_col = ts_col[0]
     print(f"🕐 타임스탬프 컬럼 발견: '{ts_col}'")
-    
-    df[ts_col] = pd.to_datetime(df[ts_col]) # datetime 객체로 변환
     if tz:
-        # 시간대 설정 (DST 및 존재하지 않는 시간 처리 포함)
-        df[ts_col] = df[ts_col].dt.tz_localize(tz, ambiguous='NaT', nonexistent='shift_forward')
         print(f"🌍 시간대 설정: {tz}")
-    
-    df = df.set_index(ts_col).sort_index() # 인덱스를 타임스탬프로 설정하고 시간순 정렬
-    print(f"📊 데이터 기간: {df.index.min()} ~ {df.index.max()}")
+
+    def index_frame(frame: pd.DataFrame) -> pd.DataFrame:
+        frame[ts_col] = pd.to_datetime(frame[ts_col]) # datetime 객체로 변환
+        if tz:
+            # 시간대 설정 (DST 및 존재하지 않는 시간 처리 포함)
+            frame[ts_col] = frame[ts_col].dt.tz_localize(tz, ambiguous='NaT', nonexistent='shift_forward')
+        frame.set_index(ts_col, inplace=True)  # 인덱스를 타임스탬프로 설정 (새 DataFrame 복사 없이)
+        if not frame.index.is_monotonic_increasing:
+            frame = frame.sort_index()  # 시간순 정렬 (이미 정렬된 로그면 복사 생략)
+        return frame
+
+    if not chunksize:
+        df = index_frame(df)
+        print(f"📊 데이터 기간: {df.index.min()} ~ {df.index.max()}")
 
     # 전력 컬럼 찾기 (다양한 명명 규칙 지원)
-    p_cols = [c for c in df.columns if str(c).lower() in ("power_w","power","watts","w")]
+    p_cols = [c for c in df.columns if str(c).lower() in _POWER_COL_NAMES]
     if not p_cols:
         raise ValueError("input_csv must contain a power column (power_W/power/watts/w)")
     p_col = p_cols[0]
-    print(f"⚡ 전력 컬럼 발견: '{p_col}' (범위: {df[p_col].min():.1f}W ~ {df[p_col].max():.1f}W)")
+    if chunksize:
+        print(f"⚡ 전력 컬럼 발견: '{p_col}'")
+    else:
+        print(f"⚡ 전력 컬럼 발견: '{p_col}' (범위: {df[p_col].min():.1f}W ~ {df[p_col].max():.1f}W)")
 
     # 선택적 환경 센서 컬럼명 표준화
     # 다양한 센서 데이터 포맷을 통일된 컬럼명으로 변환
     col_map = {}
-    sensor_mapping = [
-        ("temp_c", "room_temp_C", "실내온도"),
-        ("room_temp_c", "room_temp_C", "실내온도"), 
-        ("rh", "rh_pct", "상대습도"),
-        ("humidity", "rh_pct", "상대습도"),
-        ("lux", "lux", "조도")
-    ]
-    
     found_sensors = []
     for cand, name, desc in sensor_mapping:
         for c in df.columns:
@@ -340,27 +974,29 @@ def run_batch(
                 col_map[c] = name
                 found_sensors.append(f"{desc}({c})")
     
-    df = df.rename(columns=col_map)
     if found_sensors:
         print(f"🌡️  환경 센서 발견: {', '.join(found_sensors)}")
     else:
         print("⚠️  환경 센서 데이터 없음 (전력 기반 탐지만 수행)")
 
-    # 2. 외부 날씨 CSV 파일 로드 및 조인 (선택 사항)
+    # 2. 외부 날씨 CSV 파일 로드 (선택 사항)
     # 온도 기반 이상 탐지를 위한 실외 온도 데이터 통합
+    outside = None
     if weather_csv:
         print(f"🌤️  외부 날씨 데이터 로드 중: {weather_csv}")
-        w = pd.read_csv(weather_csv)
+        w = _read_csv(weather_csv, _TS_COL_NAMES + tuple(weather_col_candidates))
         
         # 날씨 데이터의 타임스탬프 컬럼 찾기 및 DatetimeIndex로 설정
-        w_ts_col = [c for c in w.columns if str(c).lower() in ("timestamp","time","ts","datetime")]
+        w_ts_col = [c for c in w.columns if str(c).lower() in _TS_COL_NAMES]
         if not w_ts_col:
             raise ValueError("weather_csv must have a timestamp column")
         w_ts_col = w_ts_col[0]
         w[w_ts_col] = pd.to_datetime(w[w_ts_col])
         if tz:
             w[w_ts_col] = w[w_ts_col].dt.tz_localize(tz, ambiguous='NaT', nonexistent='shift_forward')
-        w = w.set_index(w_ts_col).sort_index()
+        w.set_index(w_ts_col, inplace=True)
+        if not w.index.is_monotonic_increasing:
+            w = w.sort_index()
         
         # 외부 온도 컬럼 찾기 (다양한 컬럼명 지원)
         w_temp_col = None
@@ -373,17 +1009,25 @@ def run_batch(
                 break
         if w_temp_col is None:
             raise ValueError(f"weather_csv must contain one of {weather_col_candidates}")
-        
-        # 메인 데이터프레임에 외부 온도 데이터 시간 기준 조인
-        # 600초(10분) 허용 오차로 가장 가까운 시간의 날씨 데이터를 매칭
-        before_join = len(df)
-        df = _nearest_join(df, w[[w_temp_col]].rename(columns={w_temp_col: "outside_temp_C"}),
-                           on="outside_temp_C", tol_s=600)
-        matched_count = df['outside_temp_C'].notna().sum()
-        print(f"🔗 날씨 데이터 조인 완료: {matched_count}/{before_join}개 시점 매칭")
+        outside = w[[w_temp_col]].rename(columns={w_temp_col: "outside_temp_C"})
     else:
         print("🌡️  외부 날씨 데이터 없음 (온도 기반 탐지 비활성화)")
 
+    def standardize(frame: pd.DataFrame) -> pd.DataFrame:
+        if col_map:
+            frame.rename(columns=col_map, inplace=True)
+        if outside is not None:
+            # 메인 데이터프레임에 외부 온도 데이터 시간 기준 조인
+            # 600초(10분) 허용 오차로 가장 가까운 시간의 날씨 데이터를 매칭
+            frame = _nearest_join(frame, outside, on="outside_temp_C", tol_s=600)
+        return frame
+
+    if not chunksize:
+        df = standardize(df)
+        if outside is not None:
+            matched_count = df['outside_temp_C'].notna().sum()
+            print(f"🔗 날씨 데이터 조인 완료: {matched_count}/{len(df)}개 시점 매칭")
+
     # 3. 이상 탐지 엔진 초기화
     print(f"🧠 베이스라인 모델 로드 중: {baseline_json}")
     base = EWMABaseline.from_json(baseline_json) # 사전 학습된 통계 베이스라인 로드
@@ -394,56 +1038,129 @@ def run_batch(
     print(f"🔍 탐지기 초기화 완료 (샘플링 주기: {sample_period_s}초)")
     print(f"⚙️  탐지 설정: EWMA_k={cfg.ewma_k}, 전류한계={cfg.current_limit_A}A, 스파이크임계={cfg.spike_delta_A}A")
 
-    # 4. 실시간 스트리밍 이상 탐지 수행
-    print(f"🚀 이상 탐지 시작... (처리 대상: {len(df):,}개 데이터 포인트)")
-    
-    rows = []  # 탐지된 이벤트를 저장할 리스트
-    processed_count = 0
+    # 4. 벡터화 배치 이상 탐지 수행 (샘플별 스트리밍 처리와 동일한 결과)
+    if chunksize:
+        print("🚀 이상 탐지 시작... (청크 단위 처리)")
+    else:
+        print(f"🚀 이상 탐지 시작... (처리 대상: {len(df):,}개 데이터 포인트)")
+
+    def frames():
+        """탐지할 DataFrame을 시간순으로 반환 (청크 모드에서는 청크마다 전처리)"""
+        if not chunksize:
+            yield df
+            return
+        last_ts = None
+        for frame in itertools.chain([df], reader):
+            frame = standardize(index_frame(frame))
+            if len(frame):
+                # 청크 사이의 순서는 정렬할 수 없으므로 확인만 함
+                if last_ts is not None and frame.index[0] < last_ts:
+                    raise ValueError("input_csv must be sorted by timestamp when chunksize is set")
+                last_ts = frame.index[-1]
+            yield frame
     
-    # 데이터프레임의 각 시점을 순회하며 실시간 탐지 시뮬레이션
-    for ts, row in df.iterrows():
-        # StreamingDetector에 새로운 데이터 포인트 입력
-        evs = det.update(
-            ts = ts,  # 현재 타임스탬프
-            power_W = float(row[p_col]),  # 전력 데이터 (필수)
-            # 선택적 환경 센서 데이터 (없거나 NaN이면 None으로 전달)
-            room_temp_C = float(row["room_temp_C"]) if "room_temp_C" in row and not pd.isna(row["room_temp_C"]) else None,
-            room_rh_pct = float(row["rh_pct"]) if "rh_pct" in row and not pd.isna(row["rh_pct"]) else None,
-            lux = float(row["lux"]) if "lux" in row and not pd.isna(row["lux"]) else None,
-            outdoor_temp_C = float(row["outside_temp_C"]) if "outside_temp_C" in row and not pd.isna(row["outside_temp_C"]) else None,
-        )
-        
-        # 탐지된 이벤트들을 결과 목록에 추가
-        for e in evs:
-            rows.append(dict(
-                type=e.type,  # 이벤트 유형
-                start=e.start,  # 시작 시간
-                end=e.end,  # 종료 시간
-                severity=e.severity,  # 심각도 (warn/alert)
-                info_json=json.dumps(e.info, ensure_ascii=False)  # 상세 정보 (JSON)
-            ))
-            print(f"🚨 이상 탐지: {e.type} ({e.severity}) at {e.start}")
-        
-        processed_count += 1
-        # 진행 상황 출력 (매 10000개마다)
-        if processed_count % 10000 == 0:
-            print(f"📊 진행률: {processed_count:,}/{len(df):,} ({100*processed_count/len(df):.1f}%)")
+    events: List[Event] = []  # 탐지된 이벤트를 저장할 리스트
+    info_jsons: List[str] = []  # 이벤트 상세 정보 JSON (파일 기록과 결과 DataFrame에서 함께 사용)
+    chunk = 10000  # 진행 상황 출력 단위
+    done = 0  # 처리한 데이터 포인트 수
+    first_ts = last_ts = None
+    matched_count = 0
+
+    def part(arr: Optional[np.ndarray], lo: int, hi: int) -> Optional[np.ndarray]:
+        return None if arr is None else arr[lo:hi]
+
+    # 결과 CSV는 처음에 한 번 열고 이벤트가 나올 때마다 이어서 기록 (마지막에 전체를 to_csv로 변환하지 않음)
+    # 같은 디렉터리의 임시 파일에 기록한 뒤 성공하면 out_csv로 교체 (실패 시 기존 결과 파일 유지)
+    tmp_path = None
+    try:
+        with contextlib.ExitStack() as stack:
+            writer = None
+            if out_csv:
+                out_file = stack.enter_context(open(f"{out_csv}.{os.getpid()}.tmp", "x", newline="",
+                                                    encoding="utf-8", buffering=1 << 20))
+                tmp_path = out_file.name
+                writer = csv.writer(out_file, lineterminator=os.linesep)
+                writer.writerow(_OUT_COLUMNS)
+
+            for frame in frames():
+                total = len(frame)
+                if total:
+                    if first_ts is None:
+                        first_ts = frame.index[0]
+                    last_ts = frame.index[-1]
+                if outside is not None:
+                    matched_count += frame['outside_temp_C'].notna().sum()
+
+                # 컬럼을 연속된 float64 배열로 한 번만 추출 (행 단위 iterrows 대신 배열 단위 처리)
+                # 선택적 환경 센서 컬럼은 없으면 None, 결측은 NaN으로 전달
+                def column(name: str) -> Optional[np.ndarray]:
+                    return frame[name].to_numpy(np.float64) if name in frame.columns else None
+
+                index = frame.index
+                power = frame[p_col].to_numpy(np.float64)
+                room_temp, room_rh, lux, outdoor_temp = (column(name) for name in _SENSOR_COLS)
+
+                # 구간별로 벡터화 update_batch 호출 (탐지기 상태가 이어지므로 한 번에 처리한 것과 같은 결과)
+                for lo in range(0, total, chunk):
+                    hi = min(lo + chunk, total)
+                    evs = det.update_batch(
+                        index[lo:hi], power[lo:hi],
+                        room_temp_C=part(room_temp, lo, hi),
+                        room_rh_pct=part(room_rh, lo, hi),
+                        lux=part(lux, lo, hi),
+                        outdoor_temp_C=part(outdoor_temp, lo, hi),
+                    )
+
+                    # 탐지된 이벤트들을 결과 목록에 추가하고, 출력 파일에는 바로 기록
+                    events.extend(evs)
+                    if evs:
+                        info_json = [_info_json(e.info) for e in evs]
+                        info_jsons.extend(info_json)
+                        if writer is not None:
+                            writer.writerows((e.type, e.start, e.end, e.severity, j) for e, j in zip(evs, info_json))
+                        # 이벤트마다 print하지 않고 구간 단위로 모아 한 번에 출력 (stdout 쓰기 횟수 최소화)
+                        print("\n".join(f"🚨 이상 탐지: {e.type} ({e.severity}) at {e.start}" for e in evs))
+
+                    # 진행 상황 출력 (매 10000개마다, 청크 모드에서는 청크마다)
+                    if not chunksize and hi % chunk == 0:
+                        print(f"📊 진행률: {hi:,}/{total:,} ({100*hi/total:.1f}%)")
+                done += total
+                if chunksize:
+                    print(f"📊 진행률: {done:,}개 처리")
+        if tmp_path is not None:
+            os.replace(tmp_path, out_csv)
+            tmp_path = None
+    finally:
+        if tmp_path is not None:
+            os.remove(tmp_path)
+
+    if chunksize:
+        print(f"📊 데이터 기간: {first_ts} ~ {last_ts}")
+        if outside is not None:
+            print(f"🔗 날씨 데이터 조인 완료: {matched_count}/{done}개 시점 매칭")
     
-    # 탐지 결과를 DataFrame으로 변환
-    out_df = pd.DataFrame(rows)
+    # 탐지 결과를 컬럼 단위로 모아 DataFrame으로 변환 (이벤트별 dict 생성 없이)
+    if events:
+        out_df = pd.DataFrame({
+            "type": [e.type for e in events],  # 이벤트 유형
+            "start": [e.start for e in events],  # 시작 시간
+            "end": [e.end for e in events],  # 종료 시간
+            "severity": [e.severity for e in events],  # 심각도 (warn/alert)
+            "info_json": info_jsons,  # 상세 정보 (JSON)
+        })
+    else:
+        out_df = pd.DataFrame()
     print(f"✅ 탐지 완료! 총 {len(out_df)}개의 이상 이벤트 발견")
 
-    # 5. 결과 저장 및 요약
+    # 5. 결과 저장 및 요약 (파일은 탐지 중에 기록 완료)
     if out_csv:
-        out_df.to_csv(out_csv, index=False)
         print(f"💾 결과 저장 완료: {out_csv}")
     
     # 탐지 결과 요약 출력
     if not out_df.empty:
         print("\n📋 탐지 결과 요약:")
-        summary = out_df.groupby(['type', 'severity']).size().reset_index(name='count')
-        for _, row in summary.iterrows():
-            print(f"   • {row['type']} ({row['severity']}): {row['count']}건")
+        summary = out_df.groupby(['type', 'severity']).size()
+        print("\n".join(f"   • {t} ({sev}): {count}건" for (t, sev), count in summary.items()))
     else:
         print("✨ 이상 징후가 발견되지 않았습니다.")
     
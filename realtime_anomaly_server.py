@@ -23,13 +23,15 @@ HTTP API와 WebSocket을 통해 데이터를 받을 수 있습니다.
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse
-from pydantic import BaseModel
+from fastapi.responses import HTMLResponse, JSONResponse
+from pydantic import BaseModel, ConfigDict, StrictFloat
 import uvicorn
 import asyncio
 import json
+import time
+from collections import deque
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Set, Dict
 import pandas as pd
 
 # 기존 탐지 엔진 임포트
@@ -43,12 +45,15 @@ class SensorData(BaseModel):
     """
     실시간 센서 데이터 모델
     """
+    # 수신 후 변경하지 않는 읽기 전용 모델 (알 수 없는 필드는 무시)
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     timestamp: Optional[str] = None  # ISO 형식 타임스탬프 (없으면 현재 시간 사용)
-    power_W: float                   # 전력 사용량 (W) - 필수
-    temp_C: Optional[float] = None   # 실내 온도 (°C)
-    rh_pct: Optional[float] = None   # 상대 습도 (%)
-    lux: Optional[float] = None      # 조도 (lux)
-    outdoor_temp_C: Optional[float] = None  # 외부 온도 (°C)
+    power_W: StrictFloat             # 전력 사용량 (W) - 필수
+    temp_C: Optional[StrictFloat] = None   # 실내 온도 (°C)
+    rh_pct: Optional[StrictFloat] = None   # 상대 습도 (%)
+    lux: Optional[StrictFloat] = None      # 조도 (lux)
+    outdoor_temp_C: Optional[StrictFloat] = None  # 외부 온도 (°C)
 
 class DetectionResult(BaseModel):
     """
@@ -68,13 +73,15 @@ class RealtimeAnomalyServer:
     실시간 이상 탐지 서버
     """
     
-    def __init__(self, baseline_file: str = "ewma_baseline_ch01.json", config: Optional[Config] = None):
+    def __init__(self, baseline_file: str = "ewma_baseline_ch01.json", config: Optional[Config] = None,
+                 recent_events_max: int = 100):
         """
         서버 초기화
         
         Args:
             baseline_file: EWMA 베이스라인 파일 경로
             config: 탐지 설정 (없으면 기본값 사용)
+            recent_events_max: 새로 연결한 WebSocket 클라이언트에 보내줄 최근 이벤트 메시지 수
         """
         print("🚀 실시간 이상 탐지 서버 초기화 중...")
         
@@ -91,16 +98,27 @@ class RealtimeAnomalyServer:
         self.detector = StreamingDetector(self.baseline, self.config)
         
         # 연결된 WebSocket 클라이언트들
-        self.websocket_clients: List[WebSocket] = []
+        self.websocket_clients: Set[WebSocket] = set()
+        
+        # 최근 이벤트 메시지 (직렬화된 JSON 문자열, 오래된 것부터 자동으로 밀려남)
+        self.recent_event_messages: deque = deque(maxlen=recent_events_max)
+        
+        # 최근 이벤트 재전송 중인 클라이언트별 대기 메시지 (재전송이 끝난 뒤 순서대로 전송)
+        self._replay_pending: Dict[WebSocket, deque] = {}
         
         # 통계
         self.total_data_points = 0
         self.total_events = 0
         self.start_time = datetime.now()
+        self._start_mono_ns = time.monotonic_ns()  # 가동 시간 계산용 (시계 조정 영향 없음)
         
         print(f"🔍 탐지기 초기화 완료 (EWMA_k={self.config.ewma_k}, 전류한계={self.config.current_limit_A}A)")
         print("🌐 서버 준비 완료!")
     
+    def uptime_minutes(self) -> float:
+        """가동 시간 (분)"""
+        return (time.monotonic_ns() - self._start_mono_ns) / 6e10
+    
     async def process_data(self, sensor_data: SensorData) -> DetectionResult:
         """
         센서 데이터를 처리하고 이상 탐지 수행
@@ -111,14 +129,18 @@ class RealtimeAnomalyServer:
         Returns:
             탐지 결과
         """
-        # 타임스탬프 처리
+        # 타임스탬프 처리 (ISO 문자열은 datetime.fromisoformat으로, 그 외 형식만 pd.to_datetime으로 파싱)
+        ts = None
         if sensor_data.timestamp:
             try:
-                ts = pd.to_datetime(sensor_data.timestamp)
-            except:
-                ts = pd.Timestamp.now()
-        else:
-            ts = pd.Timestamp.now()
+                ts = datetime.fromisoformat(sensor_data.timestamp)
+            except ValueError:
+                try:
+                    ts = pd.to_datetime(sensor_data.timestamp)
+                except Exception:
+                    pass
+        if ts is None:
+            ts = datetime.now()
         
         # 이상 탐지 수행
         events = self.detector.update(
@@ -142,18 +164,18 @@ class RealtimeAnomalyServer:
             timestamp=ts.isoformat(),
             events=[{
                 "type": event.type,
-                "start": event.start.isoformat(),
-                "end": event.end.isoformat(),
+                "start": event.start_iso,
+                "end": event.end_iso,
                 "severity": event.severity,
                 "info": event.info
             } for event in events],
-            sensor_data=sensor_data.dict(),
+            sensor_data=sensor_data.model_dump(),
             stats={
                 "current_mean_W": round(current_stats[0], 2),
                 "current_std_W": round(current_stats[1], 2),
                 "total_data_points": self.total_data_points,
                 "total_events": self.total_events,
-                "uptime_minutes": round((datetime.now() - self.start_time).total_seconds() / 60, 1)
+                "uptime_minutes": round(self.uptime_minutes(), 1)
             }
         )
         
@@ -175,19 +197,50 @@ class RealtimeAnomalyServer:
         """
         모든 WebSocket 클라이언트에게 결과 브로드캐스트
         """
+        if not (self.websocket_clients or result.events):
+            return
+        message = result.model_dump_json()  # 한 번만 직렬화
+        if result.events:
+            # 나중에 접속한 클라이언트를 위해 직렬화된 메시지를 그대로 보관 (재직렬화 없음)
+            self.recent_event_messages.append(message)
         if self.websocket_clients:
-            message = result.json()
-            disconnected_clients = []
-            
+            clients = []
             for client in self.websocket_clients:
-                try:
-                    await client.send_text(message)
-                except:
-                    disconnected_clients.append(client)
+                pending = self._replay_pending.get(client)
+                if pending is not None:
+                    pending.append(message)  # 재전송 중인 클라이언트는 과거 이벤트보다 앞서지 않도록 대기
+                else:
+                    clients.append(client)
+            # 모든 클라이언트에 동시에 전송 (느린 클라이언트가 다른 클라이언트 전송을 지연시키지 않음)
+            results = await asyncio.gather(*(client.send_text(message) for client in clients),
+                                           return_exceptions=True)
             
-            # 연결이 끊어진 클라이언트 제거
-            for client in disconnected_clients:
-                self.websocket_clients.remove(client)
+            # 전송에 실패한(연결이 끊어진) 클라이언트 제거
+            for client, res in zip(clients, results):
+                if isinstance(res, Exception):
+                    self.websocket_clients.discard(client)
+    
+    async def add_websocket_client(self, websocket: WebSocket):
+        """
+        WebSocket 클라이언트 등록 후 최근 이벤트를 발생 순서대로 재전송
+        
+        재전송 중에 들어온 브로드캐스트는 대기열에 쌓았다가 재전송이 끝난 뒤 보내므로
+        클라이언트는 항상 과거 이벤트 → 새 이벤트 순서로 받습니다.
+        """
+        # 스냅샷, 대기열 생성, 등록 사이에 await가 없으므로 빠지거나 중복되는 메시지 없음
+        recent = list(self.recent_event_messages)
+        pending = self._replay_pending[websocket] = deque()
+        self.websocket_clients.add(websocket)
+        try:
+            for message in recent:
+                await websocket.send_text(message)
+            while pending:
+                await websocket.send_text(pending.popleft())
+        except Exception:
+            self.websocket_clients.discard(websocket)
+            raise
+        finally:
+            del self._replay_pending[websocket]
 
 # =============================================================================
 # FastAPI 서버 설정
@@ -197,10 +250,18 @@ class RealtimeAnomalyServer:
 server = RealtimeAnomalyServer()
 
 # FastAPI 앱 생성
+# orjson이 설치되어 있으면 응답 직렬화에 ORJSONResponse 사용
+try:
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse as DefaultResponse
+except ImportError:
+    DefaultResponse = JSONResponse
+
 app = FastAPI(
     title="실시간 EWMA 이상 탐지 서버",
     description="전력 및 환경 센서 데이터의 실시간 이상 징후 탐지",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=DefaultResponse
 )
 
 # =============================================================================
@@ -371,21 +432,23 @@ async def websocket_endpoint(websocket: WebSocket):
     WebSocket 연결 처리
     """
     await websocket.accept()
-    server.websocket_clients.append(websocket)
-    print(f"🔌 WebSocket 클라이언트 연결: {len(server.websocket_clients)}개 활성")
     
     try:
+        # 등록 + 최근 이벤트 재전송 (재전송 중 브로드캐스트는 끝난 뒤 순서대로 전송)
+        await server.add_websocket_client(websocket)
+        print(f"🔌 WebSocket 클라이언트 연결: {len(server.websocket_clients)}개 활성")
+
         while True:
             # 클라이언트로부터 데이터 수신
             data = await websocket.receive_text()
             try:
-                sensor_data = SensorData.parse_raw(data)
+                sensor_data = SensorData.model_validate_json(data)  # pydantic-core에서 JSON 파싱+검증을 한 번에 처리
                 result = await server.process_data(sensor_data)
                 await server.broadcast_to_websockets(result)
             except Exception as e:
                 await websocket.send_text(json.dumps({"error": str(e)}))
     except WebSocketDisconnect:
-        server.websocket_clients.remove(websocket)
+        server.websocket_clients.discard(websocket)
         print(f"🔌 WebSocket 클라이언트 연결 해제: {len(server.websocket_clients)}개 활성")
 
 @app.get("/api/status")
@@ -396,7 +459,7 @@ async def get_status():
     current_stats = server.detector._stats()
     return {
         "status": "running",
-        "uptime_minutes": round((datetime.now() - server.start_time).total_seconds() / 60, 1),
+        "uptime_minutes": round(server.uptime_minutes(), 1),
         "total_data_points": server.total_data_points,
         "total_events": server.total_events,
         "websocket_clients": len(server.websocket_clients),
@@ -425,10 +488,26 @@ if __name__ == "__main__":
     print("📊 상태 확인: http://localhost:8000/api/status")
     print("="*80)
     
+    # uvloop/httptools가 있으면 명시적으로 사용 (uvicorn[standard] 설치 시 포함, Windows는 uvloop 미지원)
+    # 둘 중 하나만 설치된 경우도 있으므로 각각 확인
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        loop_impl = "uvloop"
+    except ImportError:
+        loop_impl = "auto"
+    try:
+        import httptools  # noqa: F401
+        http_impl = "httptools"
+    except ImportError:
+        http_impl = "auto"
+    
     # 서버 실행
     uvicorn.run(
         app,
         host="0.0.0.0",
         port=8000,
+        loop=loop_impl,
+        http=http_impl,
         log_level="info"
     )
@@ -22,9 +22,11 @@ EWMA 기반 이상 탐지 시스템 v3 실행 스크립트
 마지막 수정: 2024
 """
 
-from home_env_power_detector_v3 import run_batch, Config # 핵심 탐지 엔진과 설정 클래스 임포트
+from home_env_power_detector_v3 import run_batch, Config, warmup_jit # 핵심 탐지 엔진과 설정 클래스 임포트
 import sys
 import os
+import time
+import contextlib
 from datetime import datetime
 
 # =============================================================================
@@ -35,6 +37,10 @@ from datetime import datetime
 # 분석할 CSV 파일 경로 (필수 컬럼: timestamp, power_W)
 INPUT_FILE = 'monitor_current_anomalies.csv'
 
+# 입력 파일을 나누어 읽을 행 수 (기본 None: 전체 로드 후 정렬)
+# EWMA_CHUNKSIZE=<행 수>로 지정하면 청크 단위로 읽음 (메모리에는 한 청크만 올라가지만 입력이 시간순 정렬되어 있어야 함)
+CHUNKSIZE = int(os.environ['EWMA_CHUNKSIZE']) if os.environ.get('EWMA_CHUNKSIZE') else None
+
 # 베이스라인 모델 파일 설정  
 # 사전 학습된 EWMA 통계 정보가 저장된 JSON 파일
 BASELINE_FILE = 'ewma_baseline_ch01.json'
@@ -43,29 +49,47 @@ BASELINE_FILE = 'ewma_baseline_ch01.json'
 # 탐지된 이상 징후 이벤트가 저장될 CSV 파일
 OUTPUT_FILE = 'v3_anomalies_output.csv'
 
+# 출력 설정
+# EWMA_QUIET=1이면 진행/요약 출력을 생략 (cron, CI 등 로그가 필요 없는 배치 실행용, 오류는 stderr로 항상 출력)
+QUIET = os.environ.get('EWMA_QUIET') == '1'
+
+_SEP = "=" * 80
+_SEP_THIN = "-" * 80
+
+
+def _p(*args, **kwargs):
+    """진행/요약 메시지 출력 (QUIET이면 생략)"""
+    if not QUIET:
+        print(*args, **kwargs)
+
+
+def _require_files(*files):
+    """
+    (설명, 경로) 목록의 파일이 모두 있는지 확인하고, 없으면 전부 출력한 뒤 종료합니다.
+    """
+    missing = [(desc, path) for desc, path in files if not os.path.isfile(path)]
+    for desc, path in missing:
+        print(f"❌ 오류: {desc}을 찾을 수 없습니다: {path}", file=sys.stderr)
+    if missing:
+        sys.exit(1)
+
 
 def main():
     """
     메인 실행 함수
     이상 탐지 시스템을 초기화하고 실행합니다.
     """
-    print("="*80)
-    print("📊 EWMA 기반 이상 탐지 시스템 v3.0")
-    print("="*80)
-    print(f"🔍 분석 대상 파일: {INPUT_FILE}")
-    print(f"🧠 베이스라인 모델: {BASELINE_FILE}")
-    print(f"💾 결과 저장 위치: {OUTPUT_FILE}")
-    print(f"🕐 시작 시간: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print("-"*80)
+    _p(_SEP)
+    _p("📊 EWMA 기반 이상 탐지 시스템 v3.0")
+    _p(_SEP)
+    _p(f"🔍 분석 대상 파일: {INPUT_FILE}")
+    _p(f"🧠 베이스라인 모델: {BASELINE_FILE}")
+    _p(f"💾 결과 저장 위치: {OUTPUT_FILE}")
+    _p(f"🕐 시작 시간: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    _p(_SEP_THIN)
     
-    # 파일 존재 여부 확인
-    if not os.path.exists(INPUT_FILE):
-        print(f"❌ 오류: 입력 파일을 찾을 수 없습니다: {INPUT_FILE}")
-        sys.exit(1)
-        
-    if not os.path.exists(BASELINE_FILE):
-        print(f"❌ 오류: 베이스라인 파일을 찾을 수 없습니다: {BASELINE_FILE}")
-        sys.exit(1)
+    # 파일 존재 여부 확인 (디렉터리는 제외, 없는 파일은 한 번에 모두 알려줌)
+    _require_files(("입력 파일", INPUT_FILE), ("베이스라인 파일", BASELINE_FILE))
 
     # 탐지 파라미터 설정
     # 기본 설정을 사용하거나, 필요에 따라 아래 파라미터들을 조정할 수 있습니다:
@@ -81,72 +105,82 @@ def main():
     
     cfg = Config()  # 기본 설정 사용
     
-    print("⚙️  탐지 설정:")
-    print(f"   - EWMA 임계값 (k): {cfg.ewma_k}")
-    print(f"   - 전류 제한: {cfg.current_limit_A}A")
-    print(f"   - 스파이크 임계: {cfg.spike_delta_A}A")
-    print(f"   - 이상 지속 시간: {cfg.ewma_sustain_sec}초")
-    print("-"*80)
+    _p("⚙️  탐지 설정:")
+    _p(f"   - EWMA 임계값 (k): {cfg.ewma_k}")
+    _p(f"   - 전류 제한: {cfg.current_limit_A}A")
+    _p(f"   - 스파이크 임계: {cfg.spike_delta_A}A")
+    _p(f"   - 이상 지속 시간: {cfg.ewma_sustain_sec}초")
+    _p(_SEP_THIN)
 
     # 이상 탐지 엔진 실행
-    print("🚀 이상 탐지 엔진 시작...")
-    print()
+    _p("🚀 이상 탐지 엔진 시작...")
+    
+    # JIT 커널을 탐지 전에 한 번 컴파일 (cache=True라 다음 실행부터는 디스크 캐시만 로드)
+    jit_start = time.perf_counter()
+    warmup_jit()
+    _p(f"⚡ JIT 커널 준비 완료 ({time.perf_counter() - jit_start:.2f}초)")
+    _p()
     
     try:
         # run_batch 함수 호출 - 메인 탐지 로직 실행
-        results_df = run_batch(
-            input_csv=INPUT_FILE,        # 분석할 데이터 파일
-            baseline_json=BASELINE_FILE, # 사전 학습된 베이스라인
-            cfg=cfg,                     # 탐지 설정
-            out_csv=OUTPUT_FILE          # 결과 저장 파일
-        )
+        # QUIET이면 run_batch의 진행 출력도 생략 (sys.stdout이 None이면 print는 아무것도 쓰지 않음)
+        with contextlib.redirect_stdout(None) if QUIET else contextlib.nullcontext():
+            results_df = run_batch(
+                input_csv=INPUT_FILE,        # 분석할 데이터 파일
+                baseline_json=BASELINE_FILE, # 사전 학습된 베이스라인
+                cfg=cfg,                     # 탐지 설정
+                out_csv=OUTPUT_FILE,         # 결과 저장 파일
+                chunksize=CHUNKSIZE          # 청크 단위 읽기
+            )
     except Exception as e:
-        print(f"❌ 오류 발생: {str(e)}")
-        print("📝 다음 사항들을 확인해주세요:")
-        print("   1. 입력 파일의 형식이 올바른지 (timestamp, power_W 컬럼 포함)")
-        print("   2. 베이스라인 파일이 손상되지 않았는지")
-        print("   3. 필요한 라이브러리가 설치되어 있는지 (pandas, numpy)")
+        print(f"❌ 오류 발생: {str(e)}", file=sys.stderr)
+        print("📝 다음 사항들을 확인해주세요:", file=sys.stderr)
+        print("   1. 입력 파일의 형식이 올바른지 (timestamp, power_W 컬럼 포함)", file=sys.stderr)
+        print("   2. 베이스라인 파일이 손상되지 않았는지", file=sys.stderr)
+        print("   3. 필요한 라이브러리가 설치되어 있는지 (pandas, numpy)", file=sys.stderr)
+        if CHUNKSIZE:
+            print("   4. 입력 파일이 시간순으로 정렬되어 있는지 (EWMA_CHUNKSIZE 사용 시)", file=sys.stderr)
         sys.exit(1)
 
-    print()
-    print("="*80)
-    print("🎉 탐지 완료!")
-    print("="*80)
-    print(f"📊 총 {len(results_df)}개의 이상 이벤트가 탐지되었습니다.")
-    print(f"💾 결과 파일: {OUTPUT_FILE}")
-    print(f"🕑 완료 시간: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    _p()
+    _p(_SEP)
+    _p("🎉 탐지 완료!")
+    _p(_SEP)
+    n_events = len(results_df)  # 이벤트 수 (이후 분기에서도 사용)
+    _p(f"📊 총 {n_events}개의 이상 이벤트가 탐지되었습니다.")
+    _p(f"💾 결과 파일: {OUTPUT_FILE}")
+    _p(f"🕑 완료 시간: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     
-    # 탐지 결과 상세 분석 및 출력
-    if not results_df.empty:
-        print("\n📋 탐지된 이벤트 상세 분석:")
-        print("-"*50)
+    # 탐지 결과 상세 분석 및 출력 (이벤트가 없거나 QUIET이면 집계 생략)
+    if n_events and not QUIET:
+        _p("\n📋 탐지된 이벤트 상세 분석:")
+        _p("-"*50)
         
-        # 이벤트 유형별 분석
-        event_summary = results_df.groupby(['type', 'severity']).size().reset_index(name='count')
+        # 이벤트 유형별 분석 (유형/심각도별 건수를 한 번만 집계하고 이후에는 집계 결과만 조회)
+        grouped = results_df.groupby(['type', 'severity']).size()
         for event_type in results_df['type'].unique():
-            type_events = event_summary[event_summary['type'] == event_type]
-            total_count = type_events['count'].sum()
-            print(f"\n🔴 {event_type}: {total_count}건")
-            for _, row in type_events.iterrows():
-                severity_icon = "🚨" if row['severity'] == 'alert' else "⚠️"
-                print(f"   {severity_icon} {row['severity']}: {row['count']}건")
+            type_counts = grouped.loc[event_type]  # 해당 유형의 심각도별 건수 (인덱스 조회)
+            _p(f"\n🔴 {event_type}: {type_counts.sum()}건")
+            for severity, count in type_counts.items():
+                severity_icon = "🚨" if severity == 'alert' else "⚠️"
+                _p(f"   {severity_icon} {severity}: {count}건")
         
-        # 심각도별 요약
-        severity_summary = results_df['severity'].value_counts()
-        print(f"\n📊 심각도별 요약:")
+        # 심각도별 요약 (같은 집계 결과 재사용, 건수 많은 순)
+        severity_summary = grouped.groupby(level='severity').sum().sort_values(ascending=False)
+        _p(f"\n📊 심각도별 요약:")
         for severity, count in severity_summary.items():
             icon = "🚨" if severity == 'alert' else "⚠️"
-            print(f"   {icon} {severity.upper()}: {count}건")
+            _p(f"   {icon} {severity.upper()}: {count}건")
             
-        print(f"\n📝 자세한 내용은 '{OUTPUT_FILE}' 파일을 확인해주세요.")
+        _p(f"\n📝 자세한 내용은 '{OUTPUT_FILE}' 파일을 확인해주세요.")
         
     else:
-        print("\n✨ 좋은 소식! 이상 징후가 발견되지 않았습니다.")
-        print("🔍 모든 전력 사용 패턴과 환경 센서 데이터가 정상 범위 내에 있습니다.")
+        _p("\n✨ 좋은 소식! 이상 징후가 발견되지 않았습니다.")
+        _p("🔍 모든 전력 사용 패턴과 환경 센서 데이터가 정상 범위 내에 있습니다.")
     
-    print("\n" + "="*80)
-    print("🚀 프로그램 종료")
-    print("="*80)
+    _p("\n" + _SEP)
+    _p("🚀 프로그램 종료")
+    _p(_SEP)
 
 
 if __name__ == "__main__":
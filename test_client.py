@@ -15,13 +15,42 @@
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import asyncio
 import websockets
 import json
 import time
 import random
+import numpy as np
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Optional
+
+try:
+    import orjson
+except ImportError:  # orjson 미설치 환경에서는 표준 json 사용
+    orjson = None
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+def _pace(deadline: float, interval_s: float) -> float:
+    """
+    deadline(time.monotonic 기준)까지 대기하고 다음 전송 시각을 반환합니다.
+
+    요청에 걸린 시간만큼 대기가 줄어들어 전송 간격이 interval_s로 유지되며,
+    이미 늦었으면 대기 없이 지금부터 다시 간격을 잽니다 (밀린 요청을 몰아서 보내지 않음).
+    """
+    delay = deadline - time.monotonic()
+    if delay > 0:
+        time.sleep(delay)
+    return max(deadline, time.monotonic()) + interval_s
+
+STATUS_CACHE_TTL_S = 1.0  # 이 시간 안에 다시 상태를 확인하면 마지막 응답 재사용
+
+def _dumps(data: Dict) -> bytes:
+    """전송 데이터를 JSON 바이트로 직렬화 (orjson 사용 가능 시 datetime도 ISO 형식으로 바로 인코딩)"""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, default=datetime.isoformat).encode("utf-8")
 
 class AnomalyTestClient:
     """
@@ -32,6 +61,16 @@ class AnomalyTestClient:
         self.server_url = server_url
         self.api_url = f"{server_url}/api/data"
         self.ws_url = server_url.replace("http", "ws") + "/ws"
+        
+        # 연결을 재사용하는 세션 (요청마다 TCP 연결/DNS 조회를 새로 하지 않음)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=8, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        
+        # 마지막 서버 상태 응답과 조회 시각 (time.monotonic 기준)
+        self._status_cache: Optional[Dict] = None
+        self._status_ts = 0.0
     
     def send_http_data(self, power_W: float, temp_C: float = 25.0, lux: float = 100.0) -> Dict:
         """
@@ -41,11 +80,11 @@ class AnomalyTestClient:
             "power_W": power_W,
             "temp_C": temp_C,
             "lux": lux,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": datetime.now()
         }
         
         try:
-            response = requests.post(self.api_url, json=data, timeout=5)
+            response = self.session.post(self.api_url, data=_dumps(data), headers=_JSON_HEADERS, timeout=5)
             if response.status_code == 200:
                 return response.json()
             else:
@@ -64,7 +103,7 @@ class AnomalyTestClient:
                 print(f"🔌 WebSocket 연결 성공: {self.ws_url}")
                 
                 for i, data in enumerate(data_points):
-                    await websocket.send(json.dumps(data))
+                    await websocket.send(_dumps(data).decode())  # 서버는 텍스트 프레임으로 수신
                     print(f"📤 [{i+1}/{len(data_points)}] 전송: 전력={data['power_W']}W")
                     
                     # 응답 수신 (논블로킹)
@@ -81,13 +120,17 @@ class AnomalyTestClient:
         except Exception as e:
             print(f"❌ WebSocket 오류: {e}")
     
-    def test_normal_data(self, count: int = 10):
+    def test_normal_data(self, count: int = 10, interval_s: float = 1.0):
         """
         정상 데이터 테스트
+        
+        탐지기는 샘플 순서에 의존하므로 요청은 순서대로 하나씩 보냅니다.
+        interval_s=0이면 대기 없이 연결 재사용 속도로 전송합니다.
         """
         print(f"\n✅ 정상 데이터 테스트 ({count}개)")
         print("-" * 50)
         
+        deadline = time.monotonic() + interval_s  # 다음 전송 시각 (요청 시간을 포함해 interval_s 간격 유지)
         for i in range(count):
             # 정상 범위의 전력 데이터 (900-1100W)
             power = random.uniform(900, 1100)
@@ -100,11 +143,12 @@ class AnomalyTestClient:
                 status = "🚨 이상!" if events else "✅ 정상"
                 print(f"[{i+1:2d}] {power:6.1f}W, {temp:4.1f}°C, {lux:5.1f}lux → {status}")
             
-            time.sleep(1)
+            if interval_s > 0:
+                deadline = _pace(deadline, interval_s)
     
-    def test_anomaly_data(self):
+    def test_anomaly_data(self, interval_s: float = 2.0):
         """
-        이상 데이터 테스트
+        이상 데이터 테스트 (케이스 간 interval_s초 대기, 0이면 대기 없음)
         """
         print(f"\n🚨 이상 데이터 테스트")
         print("-" * 50)
@@ -116,6 +160,7 @@ class AnomalyTestClient:
             {"name": "매우 높은 전력", "power": 12000, "temp": 25, "lux": 100},
         ]
         
+        deadline = time.monotonic() + interval_s
         for i, case in enumerate(anomaly_cases):
             print(f"\n[{i+1}] {case['name']} 테스트")
             result = self.send_http_data(case["power"], case["temp"], case["lux"])
@@ -131,7 +176,8 @@ class AnomalyTestClient:
             else:
                 print(f"   ❌ 오류: {result['error']}")
             
-            time.sleep(2)
+            if interval_s > 0:
+                deadline = _pace(deadline, interval_s)
     
     async def test_continuous_streaming(self, duration_minutes: int = 5):
         """
@@ -140,51 +186,54 @@ class AnomalyTestClient:
         print(f"\n📡 연속 스트리밍 테스트 ({duration_minutes}분)")
         print("-" * 50)
         
-        data_points = []
-        end_time = time.time() + (duration_minutes * 60)
+        # 50개 배치를 NumPy로 한 번에 생성 (샘플마다 random 호출하지 않음)
+        n = 50
+        rng = np.random.default_rng()
+        power = rng.uniform(900, 1100, n)  # 정상 데이터
+        temp = rng.uniform(20, 30, n)
+        lux = rng.uniform(50, 200, n)
+        # 가끔 이상 데이터 포함 (10% 확률)
+        anomaly = rng.random(n) < 0.1
+        power[anomaly] = rng.choice([8000.0, 500.0, 9900.0], size=int(anomaly.sum()))  # 이상 데이터
         
-        while time.time() < end_time:
-            # 가끔 이상 데이터 포함 (10% 확률)
-            if random.random() < 0.1:
-                power = random.choice([8000, 500, 9900])  # 이상 데이터
-            else:
-                power = random.uniform(900, 1100)  # 정상 데이터
-            
-            data_points.append({
-                "power_W": power,
-                "temp_C": random.uniform(20, 30),
-                "lux": random.uniform(50, 200),
-                "timestamp": datetime.now().isoformat()
-            })
-            
-            if len(data_points) >= 50:  # 50개씩 배치로 전송
-                break
+        data_points = [{
+            "power_W": p,
+            "temp_C": t,
+            "lux": l,
+            "timestamp": datetime.now()
+        } for p, t, l in zip(power.tolist(), temp.tolist(), lux.tolist())]
         
         await self.send_websocket_data(data_points)
     
-    def check_server_status(self):
+    def check_server_status(self, force: bool = False):
         """
         서버 상태 확인
+        
+        STATUS_CACHE_TTL_S초 안에 다시 호출하면 서버에 묻지 않고 마지막 응답을 사용합니다. (force=True면 항상 조회)
         """
-        try:
-            response = requests.get(f"{self.server_url}/api/status", timeout=5)
-            if response.status_code == 200:
-                status = response.json()
-                print("\n📊 서버 상태:")
-                print("-" * 30)
-                print(f"상태: {status['status']}")
-                print(f"가동 시간: {status['uptime_minutes']:.1f}분")
-                print(f"처리된 데이터: {status['total_data_points']}개")
-                print(f"탐지된 이벤트: {status['total_events']}개")
-                print(f"WebSocket 클라이언트: {status['websocket_clients']}개")
-                print(f"현재 평균 전력: {status['detector_stats']['current_mean_W']}W")
-                return True
-            else:
+        now = time.monotonic()
+        status = self._status_cache
+        if force or status is None or now - self._status_ts >= STATUS_CACHE_TTL_S:
+            try:
+                response = self.session.get(f"{self.server_url}/api/status", timeout=5)
+            except Exception as e:
+                print(f"❌ 서버 연결 실패: {e}")
+                return False
+            if response.status_code != 200:
                 print(f"❌ 서버 상태 확인 실패: HTTP {response.status_code}")
                 return False
-        except Exception as e:
-            print(f"❌ 서버 연결 실패: {e}")
-            return False
+            status = response.json()
+            self._status_cache, self._status_ts = status, now
+        
+        print("\n📊 서버 상태:")
+        print("-" * 30)
+        print(f"상태: {status['status']}")
+        print(f"가동 시간: {status['uptime_minutes']:.1f}분")
+        print(f"처리된 데이터: {status['total_data_points']}개")
+        print(f"탐지된 이벤트: {status['total_events']}개")
+        print(f"WebSocket 클라이언트: {status['websocket_clients']}개")
+        print(f"현재 평균 전력: {status['detector_stats']['current_mean_W']}W")
+        return True
 
 def main():
     """